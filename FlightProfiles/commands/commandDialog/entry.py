@@ -2,10 +2,39 @@ import adsk.core
 import adsk.fusion
 import math
 import os
-import re
+import time
 import traceback
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from ...profileCore import (
+    COSINE,
+    DEFAULT_BLEND_STATIONS,
+    DEFAULT_FORMAT,
+    HALF_COSINE,
+    ORDERED_LAYOUTS,
+    ProfileBlender,
+    ProfileCache,
+    Tracer,
+    content_hash,
+    file_signature,
+    matching_boxes,
+    normalize_profile_points,
+    outline_properties,
+    parse_profile_data,
+    profile_digest,
+    profile_stage_graph,
+    read_sidecar,
+    station_grid,
+    stream_profile_file,
+    surfaces_outline,
+    trace_span,
+    tracing,
+    write_sidecar,
+    write_sorted_profile_file,
+)
+from ...profileCore.profile_library import ProfileLibrary, format_library_entry
 
 app = adsk.core.Application.get()
 ui = app.userInterface
@@ -17,6 +46,16 @@ CMD_TOOLTIP = f"Import an airfoil profile CSV onto a selected plane.\n(v{config.
 
 IS_PROMOTED = True
 
+MAX_STATIONS = 8
+DEFAULT_STATIONS = 2
+MAX_BLEND_SECTIONS = 20
+MAX_RESAMPLE_STATIONS = 500
+RESAMPLE_SPACINGS = (("Cosine", COSINE), ("Half-Cosine", HALF_COSINE))
+BUILD_TIMELINE = "timeline"
+BUILD_GROUP = "group"
+BUILD_BASE_FEATURE = "base_feature"
+BUILD_MODES = (BUILD_TIMELINE, BUILD_GROUP, BUILD_BASE_FEATURE)
+
 WORKSPACE_ID = 'FusionSolidEnvironment'
 PANEL_ID = 'SolidCreatePanel'
 
@@ -26,161 +65,32 @@ TOOLCLIP_IMAGE = LOGO_IMAGE
 
 local_handlers = []
 
-
-def _parse_profile_points(file_path):
-    points = []
-
-    with open(file_path, "r", newline="") as handle:
-        for raw_line in handle:
-            line = raw_line.strip()
-            if not line or line.startswith("#"):
-                continue
-
-            delimiter = ";" if ";" in line else ","
-            if delimiter in line:
-                parts = [part.strip() for part in line.split(delimiter) if part.strip()]
-            else:
-                parts = [part for part in re.split(r"\s+", line) if part]
-
-            if len(parts) < 2:
-                continue
-
-            x_str = parts[0]
-            y_str = parts[1]
-            if delimiter == ";":
-                x_str = x_str.replace(",", ".")
-                y_str = y_str.replace(",", ".")
-
-            try:
-                x_val = float(x_str)
-                y_val = float(y_str)
-            except ValueError:
-                continue
-
-            points.append((x_val, y_val))
-
-    return points
-
-
-def _profile_tolerances(points):
-    x_vals = [x_val for x_val, _ in points]
-    y_vals = [y_val for _, y_val in points]
-    x_min = min(x_vals)
-    x_max = max(x_vals)
-    chord = x_max - x_min
-    if chord <= 0:
-        return None
-
-    max_abs_y = max(abs(y_val) for y_val in y_vals) if y_vals else 0.0
-    x_tol = max(chord * 1e-6, 1e-9)
-    y_tol = max(max_abs_y * 1e-4, chord * 1e-6, 1e-9)
-    return x_min, x_max, chord, x_tol, y_tol
-
-
-def _trailing_edge_duplicate_count(points, x_max, x_tol, y_tol):
-    count = 0
-    for x_val, y_val in reversed(points):
-        if abs(x_val - x_max) <= x_tol and abs(y_val) <= y_tol:
-            count += 1
-        else:
-            break
-    return count
-
-
-def _is_interleaved_profile(points, y_tol):
-    signs = []
-    for _, y_val in points:
-        if y_val > y_tol:
-            sign = 1
-        elif y_val < -y_tol:
-            sign = -1
-        else:
-            continue
-        if not signs or sign != signs[-1]:
-            signs.append(sign)
-    return len(signs) > 2
-
-
-def _median_dx(points):
-    if len(points) < 3:
-        return 0.0
-    dxs = [
-        points[idx + 1][0] - points[idx][0] for idx in range(len(points) - 1)
-    ]
-    dxs = [dx for dx in dxs if dx > 0]
-    if not dxs:
-        return 0.0
-    dxs.sort()
-    return dxs[len(dxs) // 2]
-
-
-def _collapse_trailing_edge(points, x_max, window, pair_tol, keep_upper):
-    if window <= 0 or pair_tol <= 0 or len(points) < 3:
-        return points
-    threshold = x_max - window
-    collapsed = []
-    for x_val, y_val in points:
-        if x_val < threshold:
-            collapsed.append((x_val, y_val))
-            continue
-        if collapsed and abs(x_val - collapsed[-1][0]) <= pair_tol:
-            if keep_upper:
-                if y_val > collapsed[-1][1]:
-                    collapsed[-1] = (x_val, y_val)
-            else:
-                if y_val < collapsed[-1][1]:
-                    collapsed[-1] = (x_val, y_val)
-        else:
-            collapsed.append((x_val, y_val))
-    return collapsed
-
-
-def _cleanup_trailing_edge(points, x_tol, y_tol):
-    if len(points) < 6:
-        return points, False
-
-    min_idx = min(range(len(points)), key=lambda idx: points[idx][0])
-    if min_idx == 0 or min_idx == len(points) - 1:
-        return points, False
-
-    upper = points[:min_idx + 1]
-    lower = points[min_idx:]
-    lower_sorted = sorted(lower, key=lambda p: p[0])
-
-    x_vals = [x_val for x_val, _ in points]
-    x_min = min(x_vals)
-    x_max = max(x_vals)
-    chord = x_max - x_min
-    if chord <= 0:
-        return points, False
-
-    edge_window = chord * 0.02
-    ys = [y_val for x_val, y_val in lower_sorted if x_val >= x_max - edge_window]
-    if len(ys) < 4:
-        return points, False
-
-    signs = []
-    for idx in range(1, len(ys)):
-        dy = ys[idx] - ys[idx - 1]
-        if abs(dy) <= y_tol:
-            continue
-        sign = 1 if dy > 0 else -1
-        if not signs or sign != signs[-1]:
-            signs.append(sign)
-
-    if len(signs) < 2:
-        return points, False
-
-    median_dx = _median_dx(lower_sorted)
-    pair_tol = max(x_tol, median_dx * 0.5) if median_dx > 0 else x_tol
-    lower_clean = _collapse_trailing_edge(
-        lower_sorted, x_max, edge_window, pair_tol, keep_upper=False
-    )
-
-    if lower_clean and upper and lower_clean[0] == upper[-1]:
-        lower_clean = lower_clean[1:]
-
-    return upper + lower_clean, True
+_LoadedProfile = namedtuple(
+    "_LoadedProfile", ["points", "error", "corrections", "profile_format", "sorted_path"]
+)
+_profile_cache = ProfileCache(max_entries=32)
+# Load settings the cached profiles were made with; see _load_settings().
+_cached_settings = None
+# Resample, scale, mirror, split, decimate, align and rotate results are kept
+# between runs, so changing one dialog value only recomputes what follows it.
+_stage_graph = profile_stage_graph(max_entries=64)
+_library = None
+_library_results = []
+# Single thread for "_sort" files when config.PROFILE_WRITE_IN_BACKGROUND is set;
+# no thread is started before the first write.
+_sort_writer = ThreadPoolExecutor(max_workers=1)
+_sort_writes = []
+# Path inputs that show a source file whose "_sort" file is still being
+# written, by source path; they switch to the "_sort" file once it exists.
+_sort_inputs = {}
+
+_Station = namedtuple(
+    "_Station", ["index", "label", "path_input", "file_path", "depth", "mirror", "offset", "angle"]
+)
+# ordered: the points are a resampled or blended contour and are split into
+# surfaces by point order instead of by grouping x values. key identifies
+# the points for the stage graph.
+_Section = namedtuple("_Section", ["name", "offset", "angle", "points", "ordered", "key"])
 
 
 def _alignment_angle_to_global_z(sketch):
@@ -227,419 +137,298 @@ def _rotate_point_2d(point, angle_rad):
     return (x_val * cos_a - y_val * sin_a, x_val * sin_a + y_val * cos_a)
 
 
-def _sort_interleaved_profile(points, x_tol, y_tol):
-    if not points:
-        return None
-
-    x_vals = [x_val for x_val, _ in points]
-    x_min = min(x_vals)
-    x_max = max(x_vals)
-    chord = x_max - x_min
-    if chord <= 0:
-        return None
-
-    sorted_points = sorted(points, key=lambda p: p[0])
-    groups = []
-    current = [sorted_points[0]]
-
-    for point in sorted_points[1:]:
-        if abs(point[0] - current[-1][0]) <= x_tol:
-            current.append(point)
-        else:
-            groups.append(current)
-            current = [point]
-
-    groups.append(current)
-
-    upper_pts = []
-    lower_pts = []
-    for group in groups:
-        x_val = sum(point[0] for point in group) / len(group)
-        ys = [point[1] for point in group]
-        max_y = max(ys)
-        min_y = min(ys)
-        has_pos = max_y > y_tol
-        has_neg = min_y < -y_tol
-
-        if has_pos and has_neg:
-            upper_pts.append((x_val, max_y))
-            lower_pts.append((x_val, min_y))
-        elif has_pos:
-            upper_pts.append((x_val, max_y))
-        elif has_neg:
-            lower_pts.append((x_val, min_y))
-        else:
-            upper_pts.append((x_val, max_y))
-            lower_pts.append((x_val, min_y))
-
-    upper_sorted = sorted(upper_pts, key=lambda p: p[0], reverse=True)
-    lower_sorted = sorted(lower_pts, key=lambda p: p[0])
-
-    edge_window = chord * 0.02
-    upper_dx = _median_dx(sorted(upper_sorted, key=lambda p: p[0]))
-    lower_dx = _median_dx(lower_sorted)
-    upper_tol = max(x_tol, upper_dx * 0.5) if upper_dx > 0 else x_tol
-    lower_tol = max(x_tol, lower_dx * 0.5) if lower_dx > 0 else x_tol
-    upper_sorted = _collapse_trailing_edge(
-        upper_sorted, x_max, edge_window, upper_tol, keep_upper=True
-    )
-    lower_sorted = _collapse_trailing_edge(
-        lower_sorted, x_max, edge_window, lower_tol, keep_upper=False
-    )
-
-    if upper_sorted and lower_sorted:
-        upper_le = upper_sorted[-1]
-        lower_le = lower_sorted[0]
-        if (
-            abs(upper_le[0] - lower_le[0]) <= x_tol
-            and abs(upper_le[1] - lower_le[1]) <= y_tol
-        ):
-            lower_sorted = lower_sorted[1:]
-
-    return upper_sorted + lower_sorted
-
-
-def _detect_profile_format(file_path):
-    delimiter = ","
-    decimal_sep = "."
-    include_z = False
-    with open(file_path, "r", newline="") as handle:
-        for raw_line in handle:
-            line = raw_line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if ";" in line:
-                delimiter = ";"
-                decimal_sep = ","
-            elif "," in line:
-                delimiter = ","
-                decimal_sep = "."
-            else:
-                delimiter = ","
-                decimal_sep = "."
-            parts = [part.strip() for part in line.split(delimiter) if part.strip()]
-            include_z = len(parts) >= 3
-            break
-    return delimiter, decimal_sep, include_z
-
+def _format_profile_error(message, label):
+    if not label:
+        return message
+    return f"{label}: {message}"
 
-def _write_sorted_profile_file(file_path, points):
-    directory = os.path.dirname(file_path)
-    base_name = os.path.basename(file_path)
-    name, ext = os.path.splitext(base_name)
-    if name.endswith("_sort"):
-        new_name = name
-    else:
-        new_name = f"{name}_sort"
-    new_path = os.path.join(directory, f"{new_name}{ext}")
-
-    delimiter, decimal_sep, include_z = _detect_profile_format(file_path)
-    fmt = "{:.8f}"
-
-    def format_value(value):
-        text = fmt.format(value)
-        if decimal_sep != ".":
-            text = text.replace(".", decimal_sep)
-        return text
-
-    lines = []
-    for x_val, y_val in points:
-        x_text = format_value(x_val)
-        y_text = format_value(y_val)
-        if include_z:
-            z_text = format_value(0.0)
-            lines.append(f"{x_text}{delimiter}{y_text}{delimiter}{z_text}")
-        else:
-            lines.append(f"{x_text}{delimiter}{y_text}")
-
-    with open(new_path, "w", newline="") as handle:
-        handle.write("\n".join(lines))
-        handle.write("\n")
-
-    return new_path
-
-
-def _validate_profile_sequence(points):
-    if len(points) < 3:
-        return "Not enough points to validate profile order."
-
-    tolerances = _profile_tolerances(points)
-    if not tolerances:
-        return "Invalid profile data: chord length is zero."
-    x_min, x_max, chord, x_tol, y_tol = tolerances
-
-    trailing_te = _trailing_edge_duplicate_count(points, x_max, x_tol, y_tol)
-    if trailing_te > 1:
-        return (
-            "CSV ends with repeated trailing-edge points (x near max, y near 0). "
-            "Remove duplicate rows to avoid zero-length errors."
-        )
 
-    te_tol = max(x_tol, chord * 0.02)
-    upper_candidates = [x_val for x_val, y_val in points if y_val >= -y_tol]
-    lower_candidates = [x_val for x_val, y_val in points if y_val <= y_tol]
-    x_max_upper = max(upper_candidates) if upper_candidates else x_max
-    x_max_lower = max(lower_candidates) if lower_candidates else x_max
-
-    first_x, first_y = points[0]
-    if abs(first_x - x_max_upper) > te_tol:
-        return "Profile must start at the trailing edge (x near max)."
-    if first_y < -y_tol:
-        return "Profile must start on the upper surface (y >= 0)."
-
-    last_x, last_y = points[-1]
-    if abs(last_x - x_max_lower) > te_tol:
-        return "Profile must end at the trailing edge (x near max)."
-    if last_y > y_tol:
-        return "Profile must end on the lower surface (y <= 0)."
-
-    signs = []
-    for _, y_val in points:
-        if y_val > y_tol:
-            sign = 1
-        elif y_val < -y_tol:
-            sign = -1
-        else:
-            continue
-        if not signs or sign != signs[-1]:
-            signs.append(sign)
-
-    if not signs:
-        return "Profile points lie on the chord line; expected upper and lower surfaces."
-    if signs[0] != 1:
-        return "Profile must start on the upper surface with positive Y values."
-    if len(signs) > 2 or (len(signs) == 2 and signs[1] != -1):
-        return (
-            "Profile points alternate between upper and lower surfaces. "
-            "Expected all upper points first, then all lower points."
-        )
+def _format_correction_message(label, correction_note, file_path, effective_path):
+    message = _format_profile_error(correction_note, label)
+    if effective_path != file_path:
+        return f"{message}\nSaved to:\n{effective_path}"
+    return message
 
-    le_indices = [
-        idx for idx, (x_val, _) in enumerate(points) if abs(x_val - x_min) <= x_tol
-    ]
-    if not le_indices:
-        return "Leading edge (min X) not found in profile."
-    if not any(abs(points[idx][1]) <= y_tol for idx in le_indices):
-        return "Leading edge (min X) should be near y = 0."
-
-    prev_x = points[0][0]
-    for idx in range(1, le_indices[0] + 1):
-        x_val = points[idx][0]
-        if x_val > prev_x + x_tol:
-            return "Upper surface must move toward the leading edge (x decreasing)."
-        prev_x = x_val
-
-    prev_x = points[le_indices[-1]][0]
-    for idx in range(le_indices[-1] + 1, len(points)):
-        x_val = points[idx][0]
-        if x_val < prev_x - x_tol:
-            return "Lower surface must move toward the trailing edge (x increasing)."
-        prev_x = x_val
-
-    for idx in range(0, le_indices[0] + 1):
-        if points[idx][1] < -y_tol:
-            return (
-                "Upper surface contains negative Y values. "
-                "Expected positive Y values up to the leading edge."
-            )
-    for idx in range(le_indices[-1], len(points)):
-        if points[idx][1] > y_tol:
-            return (
-                "Lower surface contains positive Y values. "
-                "Expected negative Y values after the leading edge."
-            )
 
-    return None
+# Files of at least config.PROFILE_STREAM_BYTES are parsed in blocks and
+# keyed on their path, timestamp and size instead of their content, so they
+# are read once, by the parser. The thinning settings and the ordering are
+# part of their key, so a cached profile or sidecar made with other settings
+# is not used.
+def _stream_digest(signature):
+    settings = (
+        f"{signature.path}:{signature.mtime_ns}:{signature.size}:"
+        f"{config.PROFILE_STREAM_MAX_POINTS}:{config.PROFILE_STREAM_RESOLUTION}"
+    )
+    return profile_digest(
+        content_hash(settings.encode("utf-8", "surrogateescape")), config.PROFILE_ORDERING
+    )
 
 
-def _format_profile_error(message, label):
-    if not label:
-        return message
-    return f"{label}: {message}"
+# The config values that change the points loaded from a file. config can be
+# reloaded while the add-in runs, so they are part of the stage graph keys,
+# and the profile cache, which finds files by timestamp first, is cleared
+# when they change.
+def _load_settings():
+    return (
+        config.PROFILE_ORDERING,
+        config.PROFILE_STREAM_BYTES,
+        config.PROFILE_STREAM_MAX_POINTS,
+        config.PROFILE_STREAM_RESOLUTION,
+    )
 
 
-def _load_profile_points(file_path, label=None):
-    points = _parse_profile_points(file_path)
-    if len(points) < 2:
-        return None, _format_profile_error(
-            "No valid point pairs found in the CSV file.", label
-        ), file_path, None
+def _check_load_settings():
+    global _cached_settings
+    settings = _load_settings()
+    if settings != _cached_settings:
+        _profile_cache.clear()
+        _cached_settings = settings
 
-    tolerances = _profile_tolerances(points)
-    if not tolerances:
-        return None, _format_profile_error(
-            "Invalid profile data: chord length is zero.", label
-        ), file_path, None
-    _, x_max, _, x_tol, y_tol = tolerances
 
-    corrections = []
-    trailing_te = _trailing_edge_duplicate_count(points, x_max, x_tol, y_tol)
-    if trailing_te > 1:
-        points = points[: -(trailing_te - 1)]
-        corrections.append("Removed repeated trailing-edge rows.")
+def _parse_profile_file(file_path, data, log=futil.log):
+    if data is not None:
+        return parse_profile_data(data, file_path)
+    streamed = stream_profile_file(
+        file_path, config.PROFILE_STREAM_MAX_POINTS, config.PROFILE_STREAM_RESOLUTION
+    )
+    if streamed is None:
+        with open(file_path, "rb") as handle:
+            return parse_profile_data(handle.read(), file_path)
+    log(
+        f"{CMD_NAME}: streamed {streamed.rows} rows ({streamed.size / 2 ** 20:.1f} MB) "
+        f"at {streamed.rows_per_second:,.0f} rows/s, kept {len(streamed.points)} points"
+    )
+    return streamed.points, streamed.profile_format
 
-    if _is_interleaved_profile(points, y_tol):
-        sorted_points = _sort_interleaved_profile(points, x_tol, y_tol)
-        if not sorted_points:
-            return None, _format_profile_error(
-                "Unable to sort interleaved profile points.", label
-            ), file_path, None
-        points = sorted_points
-        corrections.append("Interleaved points were sorted.")
 
-    points, te_fixed = _cleanup_trailing_edge(points, x_tol, y_tol)
-    if te_fixed:
-        corrections.append("Collapsed trailing-edge oscillations.")
+def _load_uncached_profile(file_path, data, digest, log=futil.log):
+    if config.PROFILE_SIDECAR:
+        sidecar = read_sidecar(file_path, digest)
+        if sidecar:
+            return _LoadedProfile(
+                sidecar.points, None, sidecar.corrections, sidecar.profile_format, None
+            )
 
-    error = _validate_profile_sequence(points)
+    points, profile_format = _parse_profile_file(file_path, data, log)
+    points, error, corrections = normalize_profile_points(
+        points, profile_format.layout in ORDERED_LAYOUTS, config.PROFILE_ORDERING
+    )
     if error:
-        return None, _format_profile_error(error, label), file_path, None
+        return _LoadedProfile(None, error, tuple(corrections), profile_format, None)
 
-    if corrections:
+    if config.PROFILE_SIDECAR:
         try:
-            new_path = _write_sorted_profile_file(file_path, points)
+            write_sidecar(file_path, digest, points, corrections, profile_format)
         except OSError as exc:
-            return None, _format_profile_error(
-                f"Unable to write corrected CSV file: {exc}", label
-            ), file_path, None
-        return points, None, new_path, " ".join(corrections)
+            log(f"{CMD_NAME}: Unable to write profile sidecar: {exc}")
+    return _LoadedProfile(points, None, tuple(corrections), profile_format, None)
+
+
+def _write_sorted_profile(file_path, signature, loaded):
+    profile_format = loaded.profile_format or DEFAULT_FORMAT
+    with trace_span("write_correction", points=len(loaded.points)) as span:
+        sorted_file = write_sorted_profile_file(file_path, loaded.points, profile_format)
+        span.args["written"] = sorted_file.written
+    _profile_cache.replace(signature, loaded._replace(sorted_path=sorted_file.path))
+    _profile_cache.put(
+        file_signature(sorted_file.path),
+        profile_digest(sorted_file.digest, config.PROFILE_ORDERING),
+        _LoadedProfile(loaded.points, None, (), profile_format, sorted_file.path),
+    )
+    return sorted_file
 
-    return points, None, file_path, None
 
+def _log_sorted_write(sorted_file, log=futil.log):
+    state = "written" if sorted_file.written else "unchanged, not rewritten"
+    log(f"{CMD_NAME}: corrected CSV {state}: {sorted_file.path}")
 
-def _scale_points(points, target_depth):
-    xs = [x_val for x_val, _ in points]
-    min_x = min(xs)
-    max_x = max(xs)
-    chord = max_x - min_x
-    if chord <= 0:
-        raise ValueError("Invalid profile data: chord length is zero.")
 
-    scale = target_depth / chord
-    return [((x_val - min_x) * scale + min_x, y_val * scale) for x_val, y_val in points]
+# Returns the path of the "_sort" file, or None while it is written in the
+# background; until then the source file stays in use.
+def _export_sorted_profile(file_path, signature, loaded, log=futil.log):
+    if config.PROFILE_WRITE_IN_BACKGROUND:
+        future = _sort_writer.submit(_write_sorted_profile, file_path, signature, loaded)
+        _sort_writes.append((file_path, future))
+        return None
 
+    sorted_file = _write_sorted_profile(file_path, signature, loaded)
+    _log_sorted_write(sorted_file, log)
+    return sorted_file.path
 
-def _profile_name_from_path(file_path):
-    base_name = os.path.basename(file_path)
-    name, _ = os.path.splitext(base_name)
-    return name or "Profile"
 
+def _sort_write_key(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
 
-def _compute_leading_edge(points, x_tol=1e-6):
-    min_x = min(point[0] for point in points)
-    near_le = [point[1] for point in points if abs(point[0] - min_x) <= x_tol]
-    if not near_le:
-        return min_x, 0.0
-    avg_y = sum(near_le) / len(near_le)
-    return min_x, avg_y
 
+# Switches path_input from file_path to its "_sort" file once a pending
+# background write of it has succeeded.
+def _switch_when_written(path_input, file_path):
+    key = _sort_write_key(file_path)
+    if any(_sort_write_key(path) == key for path, _ in _sort_writes):
+        _sort_inputs.setdefault(key, []).append(path_input)
 
-def _rotate_points(points, angle_rad, pivot):
-    if abs(angle_rad) < 1e-12:
-        return points
 
-    cos_a = math.cos(angle_rad)
-    sin_a = math.sin(angle_rad)
-    px, py = pivot
-    rotated = []
-    for x_val, y_val in points:
-        dx = x_val - px
-        dy = y_val - py
-        rx = px + dx * cos_a - dy * sin_a
-        ry = py + dx * sin_a + dy * cos_a
-        rotated.append((rx, ry))
-    return rotated
-
-def _group_by_x(points):
-    sorted_points = sorted(points, key=lambda p: p[0])
-    if len(sorted_points) < 3:
-        return None
+# Background writes are logged on the main thread once they are done. Before
+# the next load and when the add-in stops, all of them are waited for. A
+# failed write leaves no file and the inputs keep the source file, so the
+# next import that needs it retries.
+def _finish_sorted_writes(wait=True):
+    global _sort_writes
+    pending = [write for write in _sort_writes if wait or write[1].done()]
+    _sort_writes = [write for write in _sort_writes if write not in pending]
+    for file_path, future in pending:
+        path_inputs = _sort_inputs.pop(_sort_write_key(file_path), ())
+        try:
+            sorted_file = future.result()
+        except OSError as exc:
+            futil.log(f"{CMD_NAME}: Unable to write corrected CSV file for {file_path}: {exc}")
+            continue
+        _log_sorted_write(sorted_file)
+        for path_input in path_inputs:
+            if path_input.isValid and path_input.value == file_path:
+                path_input.value = sorted_file.path
 
-    dxs = [
-        sorted_points[idx + 1][0] - sorted_points[idx][0]
-        for idx in range(len(sorted_points) - 1)
-    ]
-    dxs = [dx for dx in dxs if dx > 0]
-    if len(dxs) < 2:
-        return None
 
-    dxs_sorted = sorted(dxs)
-    small_idx = max(0, int(len(dxs_sorted) * 0.2) - 1)
-    small_dx = dxs_sorted[small_idx]
-    median_dx = dxs_sorted[len(dxs_sorted) // 2]
-    if median_dx <= 0 or small_dx > median_dx * 0.25:
-        return None
+def _load_profile_points(file_path, label=None, export_csv=False, log=futil.log):
+    _check_load_settings()
+    try:
+        signature = file_signature(file_path)
+        loaded = _profile_cache.get(signature)
+        if loaded is None:
+            if signature.size >= config.PROFILE_STREAM_BYTES:
+                data = None
+                digest = _stream_digest(signature)
+            else:
+                with trace_span("read", file=os.path.basename(file_path)) as span:
+                    with open(file_path, "rb") as handle:
+                        data = handle.read()
+                    span.args["bytes"] = len(data)
+                digest = profile_digest(content_hash(data), config.PROFILE_ORDERING)
+            loaded = _profile_cache.get_by_hash(signature, digest)
+            if loaded is None:
+                loaded = _load_uncached_profile(file_path, data, digest, log)
+                _profile_cache.put(signature, digest, loaded)
+    except OSError as exc:
+        return None, _format_profile_error(
+            f"Unable to read CSV file: {exc}", label
+        ), file_path, None
+    except ValueError as exc:
+        return None, _format_profile_error(
+            f"Unable to parse profile file: {exc}", label
+        ), file_path, None
 
-    tol = small_dx * 1.5 if small_dx > 0 else median_dx * 0.1
-    groups = []
-    current = [sorted_points[0]]
+    log(f"{CMD_NAME}: profile cache {_profile_cache.stats()}")
+    if loaded.error:
+        return None, _format_profile_error(loaded.error, label), file_path, None
+    if not loaded.corrections:
+        return loaded.points, None, file_path, None
 
-    for point in sorted_points[1:]:
-        if abs(point[0] - current[-1][0]) <= tol:
-            current.append(point)
-        else:
-            groups.append(current)
-            current = [point]
+    correction_note = " ".join(loaded.corrections)
+    if not export_csv:
+        return loaded.points, None, file_path, correction_note
 
-    groups.append(current)
+    if not loaded.sorted_path or not os.path.isfile(loaded.sorted_path):
+        try:
+            sorted_path = _export_sorted_profile(file_path, signature, loaded, log)
+        except OSError as exc:
+            return None, _format_profile_error(
+                f"Unable to write corrected CSV file: {exc}", label
+            ), file_path, None
+        if sorted_path is None:
+            return loaded.points, None, file_path, correction_note
+        loaded = loaded._replace(sorted_path=sorted_path)
+    return loaded.points, None, loaded.sorted_path, correction_note
+
+
+# check rescans only when a library folder gained or lost files; a browsed
+# folder is indexed without its subfolders.
+def _get_library(rescan=False, folder=None, check=False):
+    global _library
+    folders = list(config.PROFILE_LIBRARY_FOLDERS)
+    if _library is None:
+        _library = ProfileLibrary.load(
+            config.PROFILE_LIBRARY_INDEX,
+            config.PROFILE_STREAM_BYTES,
+            config.PROFILE_STREAM_MAX_POINTS,
+        )
+        check = True
+    if folder and _library.add_browsed(folder):
+        rescan = True
+    if check and not rescan:
+        rescan = _library.needs_scan(folders)
+    if not rescan:
+        return _library
+
+    result = _library.scan(folders)
+    futil.log(
+        f"{CMD_NAME}: profile library {len(_library)} profiles, {result.added} added, "
+        f"{result.updated} updated, {result.removed} removed in {result.seconds * 1000.0:.1f} ms"
+    )
+    try:
+        _library.save()
+    except OSError as exc:
+        futil.log(f"{CMD_NAME}: unable to save profile library: {exc}")
+    return _library
 
-    paired_groups = [group for group in groups if len(group) >= 2]
-    if len(paired_groups) < 2:
-        return None
 
-    lower_pts = []
-    upper_pts = []
-    for group in groups:
-        low_pt = min(group, key=lambda p: p[1])
-        up_pt = max(group, key=lambda p: p[1])
-        lower_pts.append((low_pt[0], low_pt[1]))
-        upper_pts.append((up_pt[0], up_pt[1]))
-
-    return lower_pts, upper_pts
-
-
-def _split_profile(points):
-    grouped = _group_by_x(points)
-    if grouped:
-        return grouped
-
-    sorted_points = sorted(points, key=lambda p: p[0])
-    groups = []
-    current = [sorted_points[0]]
-
-    for x_val, y_val in sorted_points[1:]:
-        if abs(x_val - current[-1][0]) <= 1e-6:
-            current.append((x_val, y_val))
-        else:
-            groups.append(current)
-            current = [(x_val, y_val)]
-
-    groups.append(current)
-
-    paired_count = sum(1 for group in groups if len(group) >= 2)
-    if paired_count >= max(3, len(groups) // 4):
-        lower_pts = []
-        upper_pts = []
-        for group in groups:
-            ys = [point[1] for point in group]
-            x_val = group[0][0]
-            lower_pts.append((x_val, min(ys)))
-            upper_pts.append((x_val, max(ys)))
-        return lower_pts, upper_pts
-
-    min_idx = min(range(len(points)), key=lambda idx: points[idx][0])
-    upper_pts = points[:min_idx + 1]
-    lower_pts = points[min_idx:]
-    upper_pts = sorted(upper_pts, key=lambda p: p[0])
-    lower_pts = sorted(lower_pts, key=lambda p: p[0])
-    return lower_pts, upper_pts
+def _update_library_results(command_inputs):
+    global _library_results
+    results_input = command_inputs.itemById("libraryResults")
+    search_input = command_inputs.itemById("librarySearch")
+    if not results_input:
+        return
+    query = search_input.value if search_input else ""
+    _library_results = _get_library().search(
+        query, config.PROFILE_LIBRARY_RESULTS, valid_only=True
+    )
+    list_items = results_input.listItems
+    list_items.clear()
+    for index, entry in enumerate(_library_results):
+        list_items.add(format_library_entry(entry), index == 0, "")
+
+
+def _select_station_file(command_inputs, index, file_path):
+    path_input = command_inputs.itemById(f"csvPath{_station_suffix(index)}")
+    if not path_input:
+        return False
+    path_input.value = file_path
+    label = f"Profile {index}"
+    export_input = command_inputs.itemById("exportSortedCsv")
+    export_csv = bool(export_input and export_input.value)
+    _, error, effective_path, correction_note = _load_profile_points(file_path, label, export_csv)
+    if error:
+        ui.messageBox(error)
+        path_input.value = ""
+        return False
+    path_input.value = effective_path
+    if export_csv and effective_path == file_path:
+        _switch_when_written(path_input, file_path)
+    if correction_note:
+        ui.messageBox(
+            _format_correction_message(label, correction_note, file_path, effective_path)
+        )
+    return True
+
+
+def _profile_name_from_path(file_path):
+    base_name = os.path.basename(file_path)
+    name, _ = os.path.splitext(base_name)
+    return name or "Profile"
 
 
 def _add_spline(sketch_curves, points):
-    obj_collection = adsk.core.ObjectCollection.create()
-    for point in points:
-        obj_collection.add(point)
+    create_with_array = getattr(adsk.core.ObjectCollection, "createWithArray", None)
+    if create_with_array:
+        obj_collection = create_with_array(points)
+        api_calls = 1
+    else:
+        obj_collection = adsk.core.ObjectCollection.create()
+        for point in points:
+            obj_collection.add(point)
+        api_calls = 1 + len(points)
     sketch_curves.sketchFittedSplines.add(obj_collection)
+    return api_calls + 1
 
 
 def _resolve_plane(selection_entity):
@@ -660,57 +449,196 @@ def _resolve_plane(selection_entity):
     return selection_entity
 
 
-def _create_offset_plane(component, base_plane, offset_value):
+def _create_offset_plane(component, base_plane, offset_value, in_base_feature=False):
     planes = component.constructionPlanes
     plane_input = planes.createInput()
-    plane_input.setByOffset(base_plane, adsk.core.ValueInput.createByReal(offset_value))
+    if in_base_feature:
+        plane_input.setByPlane(_offset_plane_geometry(base_plane, offset_value))
+    else:
+        plane_input.setByOffset(base_plane, adsk.core.ValueInput.createByReal(offset_value))
     return planes.add(plane_input)
 
 
-def _draw_profile(sketch, points, rotation_rad=0.0, pivot=None, align_angle=0.0):
-    lower_pts, upper_pts = _split_profile(points)
-    if len(lower_pts) < 2 or len(upper_pts) < 2:
-        raise ValueError("Not enough points to build upper and lower curves.")
+# Inside a base feature a construction plane can only be given by its
+# geometry, so the offset is applied to a copy of the base plane. A face is
+# offset along its outward normal, as setByOffset does.
+def _offset_plane_geometry(base_plane, offset_value):
+    plane = base_plane.geometry.copy()
+    normal = plane.normal
+    face = adsk.fusion.BRepFace.cast(base_plane)
+    if face:
+        _, normal = face.evaluator.getNormalAtPoint(face.pointOnFace)
+    normal.normalize()
+    normal.scaleBy(offset_value)
+    origin = plane.origin
+    origin.translateBy(normal)
+    plane.origin = origin
+    return plane
+
+
+# Collects the timeline entries of one import as config.PROFILE_BUILD_MODE
+# asks. With "group" and "base_feature" the sketches stay deferred until all
+# of them are drawn and are then solved together. "group" gathers every entry
+# in one collapsed timeline group. "base_feature" builds the planes and
+# sketches inside one base feature, which Fusion does not recompute
+# parametrically; the loft follows it. Direct-modelling designs have no
+# timeline and are always built entry by entry.
+class _GeometryBuild:
+    def __init__(self, design, component, mode, name):
+        if mode not in BUILD_MODES:
+            futil.log(f"{CMD_NAME}: Unknown build mode {mode!r}, using {BUILD_TIMELINE!r}")
+            mode = BUILD_TIMELINE
+        if design.designType != adsk.fusion.DesignTypes.ParametricDesignType:
+            mode = BUILD_TIMELINE
+        self.mode = mode
+        self.design = design
+        self.component = component
+        self.name = name
+        self.base_feature = None
+        # BaseFeature has no edit state to query, so it is tracked here.
+        self.editing = False
+        self.deferred = []
+        self.start = design.timeline.markerPosition if mode == BUILD_GROUP else None
+        if mode == BUILD_BASE_FEATURE:
+            with trace_span("base_feature", action="start"):
+                self.base_feature = component.features.baseFeatures.add()
+                self.base_feature.name = name
+                self.base_feature.startEdit()
+                self.editing = True
+
+    @property
+    def defers_compute(self):
+        return self.mode != BUILD_TIMELINE
+
+    @property
+    def in_base_feature(self):
+        return self.editing
+
+    def add_sketch(self, plane, name):
+        sketch = self.component.sketches.add(plane)
+        sketch.name = name
+        if self.defers_compute:
+            self.deferred.append(sketch)
+        return sketch
+
+    # Solves the deferred sketches and closes the base feature, so their
+    # profiles can be lofted.
+    def finish_sketches(self):
+        if self.deferred:
+            with trace_span("profile_detection", sketches=len(self.deferred)):
+                for sketch in self.deferred:
+                    sketch.isComputeDeferred = False
+            self.deferred = []
+        if self.in_base_feature:
+            with trace_span("base_feature", action="finish"):
+                self.base_feature.finishEdit()
+                self.editing = False
+
+    def finish(self):
+        self.finish_sketches()
+        if self.start is None:
+            return
+        timeline = self.design.timeline
+        end = timeline.markerPosition - 1
+        if end > self.start:
+            with trace_span("timeline_group", entries=end - self.start + 1):
+                group = timeline.timelineGroups.add(self.start, end)
+                group.name = self.name
+                group.isCollapsed = True
+
+
+def _log_stage_run(label, run, fit_tolerance):
+    if run.computed:
+        futil.log(f"{CMD_NAME}: {label}: recomputed {', '.join(run.computed)}")
+    if "decimate" in run.computed and fit_tolerance > 0:
+        split = run.outputs["split"]
+        decimated = run.outputs["decimate"]
+        before = len(split.lower) + len(split.upper)
+        after = len(decimated.lower) + len(decimated.upper)
+        futil.log(
+            f"{CMD_NAME}: {label}: fit points {before} -> {after}, "
+            f"max deviation {decimated.max_error:.6g} (tolerance {fit_tolerance:.6g})"
+        )
 
-    if abs(align_angle) > 1e-12:
-        lower_pts = _rotate_points(lower_pts, align_angle, (0.0, 0.0))
-        upper_pts = _rotate_points(upper_pts, align_angle, (0.0, 0.0))
 
-    if pivot is not None and abs(rotation_rad) > 1e-12:
-        lower_pts = _rotate_points(lower_pts, rotation_rad, pivot)
-        upper_pts = _rotate_points(upper_pts, rotation_rad, pivot)
+# keep_deferred leaves the sketch unsolved for a _GeometryBuild to solve.
+def _draw_profile(sketch, surfaces, keep_deferred=False):
+    lower_pts = surfaces.lower
+    upper_pts = surfaces.upper
 
+    start_time = time.perf_counter()
     lower_3d = [adsk.core.Point3D.create(x_val, y_val, 0) for x_val, y_val in lower_pts]
     upper_3d = [adsk.core.Point3D.create(x_val, y_val, 0) for x_val, y_val in upper_pts]
+    api_calls = len(lower_3d) + len(upper_3d)
 
-    sketch_curves = sketch.sketchCurves
-    sketch_lines = sketch_curves.sketchLines
-    _add_spline(sketch_curves, lower_3d)
-    _add_spline(sketch_curves, upper_3d)
+    lower_index = lower_pts.sorted_profile()
+    upper_index = upper_pts.sorted_profile()
+    edge_pairs = (
+        (lower_index.le_index, upper_index.le_index),
+        (lower_index.te_index, upper_index.te_index),
+    )
 
-    lower_le = min(lower_pts, key=lambda p: p[0])
-    upper_le = min(upper_pts, key=lambda p: p[0])
-    lower_te = max(lower_pts, key=lambda p: p[0])
-    upper_te = max(upper_pts, key=lambda p: p[0])
+    # Keep the sketch from solving and re-detecting profiles after every
+    # curve; everything is resolved once when compute is re-enabled.
+    sketch.isComputeDeferred = True
+    api_calls += 1
+    try:
+        with trace_span("spline", sketch=sketch.name, points=len(lower_3d) + len(upper_3d)):
+            sketch_curves = sketch.sketchCurves
+            sketch_lines = sketch_curves.sketchLines
+            api_calls += 2
+            api_calls += _add_spline(sketch_curves, lower_3d)
+            api_calls += _add_spline(sketch_curves, upper_3d)
+
+            for lower_idx, upper_idx in edge_pairs:
+                lower_edge = lower_pts[lower_idx]
+                upper_edge = upper_pts[upper_idx]
+                gap = math.hypot(lower_edge[0] - upper_edge[0], lower_edge[1] - upper_edge[1])
+                if gap > 1e-6:
+                    sketch_lines.addByTwoPoints(lower_3d[lower_idx], upper_3d[upper_idx])
+                    api_calls += 1
+    finally:
+        if not keep_deferred:
+            with trace_span("profile_detection", sketch=sketch.name):
+                sketch.isComputeDeferred = False
+            api_calls += 1
+
+    futil.log(
+        f"{CMD_NAME}: sketch '{sketch.name}' built with {api_calls} API calls "
+        f"in {(time.perf_counter() - start_time) * 1000.0:.1f} ms"
+    )
 
-    le_lower_pt = adsk.core.Point3D.create(lower_le[0], lower_le[1], 0)
-    le_upper_pt = adsk.core.Point3D.create(upper_le[0], upper_le[1], 0)
-    te_lower_pt = adsk.core.Point3D.create(lower_te[0], lower_te[1], 0)
-    te_upper_pt = adsk.core.Point3D.create(upper_te[0], upper_te[1], 0)
 
-    if le_lower_pt.distanceTo(le_upper_pt) > 1e-6:
-        sketch_lines.addByTwoPoints(le_lower_pt, le_upper_pt)
-    if te_lower_pt.distanceTo(te_upper_pt) > 1e-6:
-        sketch_lines.addByTwoPoints(te_lower_pt, te_upper_pt)
+def _profile_box(profile):
+    try:
+        box = profile.boundingBox
+        return (box.minPoint.x, box.minPoint.y, box.maxPoint.x, box.maxPoint.y)
+    except Exception:
+        return None
 
 
-def _get_primary_profile(sketch):
-    if sketch.profiles.count == 0:
+# The sketch region whose bounding box matches the drawn outline is the
+# profile; Fusion only computes areas when no single region matches.
+def _get_primary_profile(sketch, outline=None):
+    profiles = sketch.profiles
+    if profiles.count == 0:
         return None
 
+    candidates = list(profiles)
+    if outline is not None:
+        matches = matching_boxes([_profile_box(profile) for profile in candidates], outline)
+        if len(matches) == 1:
+            return candidates[matches[0]]
+        futil.log(
+            f"{CMD_NAME}: sketch '{sketch.name}': {len(matches)} of {len(candidates)} "
+            f"profiles match the outline, comparing areas"
+        )
+        if matches:
+            candidates = [candidates[idx] for idx in matches]
+
     primary = None
-    max_area = -1.0
-    for profile in sketch.profiles:
+    best_score = None
+    for profile in candidates:
         try:
             area = abs(
                 profile.areaProperties(
@@ -719,13 +647,203 @@ def _get_primary_profile(sketch):
             )
         except Exception:
             area = 0.0
-        if area > max_area:
-            max_area = area
+        score = abs(area - outline.area) if outline is not None else -area
+        if best_score is None or score < best_score:
+            best_score = score
             primary = profile
 
     return primary
 
 
+def _surfaces_outline(surfaces):
+    return outline_properties(surfaces_outline(surfaces.lower, surfaces.upper))
+
+
+def _station_suffix(index):
+    return "" if index == 1 else str(index)
+
+
+def _station_index(input_id, prefix):
+    suffix = input_id[len(prefix):]
+    return int(suffix) if suffix else 1
+
+
+def _add_station_group(inputs, index, default_units, default_angle_units):
+    suffix = _station_suffix(index)
+    group = inputs.addGroupCommandInput(f"profile{index}Group", f"Profile {index}")
+    group.isExpanded = True
+    group.isVisible = index <= DEFAULT_STATIONS
+    children = group.children
+    children.addBoolValueInput(f"browseCsv{suffix}", "Browse...", False, "", False)
+    children.addStringValueInput(f"csvPath{suffix}", "CSV File", "")
+    children.addValueInput(
+        f"profileDepth{suffix}",
+        "Profile Depth",
+        default_units,
+        adsk.core.ValueInput.createByString("1"),
+    )
+    children.addBoolValueInput(f"mirrorProfile{suffix}", "Mirror", True, "", False)
+    if index > 1:
+        children.addValueInput(
+            f"profileOffset{suffix}",
+            "Profile Offset",
+            default_units,
+            adsk.core.ValueInput.createByString("0"),
+        )
+        children.addValueInput(
+            f"profileAngle{suffix}",
+            "Profile Rotation",
+            default_angle_units,
+            adsk.core.ValueInput.createByString("0"),
+        )
+
+
+def _read_stations(inputs):
+    stations = []
+    for index in range(1, inputs.itemById("stationCount").value + 1):
+        suffix = _station_suffix(index)
+        label = f"Profile {index}"
+        path_input = inputs.itemById(f"csvPath{suffix}")
+        file_path = path_input.value.strip()
+        offset = inputs.itemById(f"profileOffset{suffix}").value if index > 1 else 0.0
+        angle = inputs.itemById(f"profileAngle{suffix}").value if index > 1 else 0.0
+
+        if not file_path and index > 1:
+            if abs(offset) > 1e-9:
+                return None, f"{label}: CSV file is required when a non-zero offset is specified."
+            continue
+        if not file_path or not os.path.isfile(file_path):
+            return None, f"Select a valid CSV file for profile {index}."
+
+        depth = inputs.itemById(f"profileDepth{suffix}").value
+        if depth <= 0:
+            return None, f"Profile depth (profile {index}) must be greater than zero."
+
+        mirror = inputs.itemById(f"mirrorProfile{suffix}").value
+        stations.append(
+            _Station(index, label, path_input, file_path, depth, mirror, offset, angle)
+        )
+    return stations, None
+
+
+def _station_path_key(station):
+    return os.path.normcase(os.path.abspath(station.file_path))
+
+
+def _load_station_file(station, export_csv):
+    start = time.perf_counter()
+    result = _load_profile_points(station.file_path, None, export_csv)
+    return result, time.perf_counter() - start
+
+
+# Every distinct file is read, normalized and validated once, one after the
+# other: the work is pure Python, so threads would only wait on each other.
+def _load_station_files(stations, export_csv):
+    _finish_sorted_writes()
+    jobs = {}
+    for station in stations:
+        jobs.setdefault(_station_path_key(station), station)
+
+    start = time.perf_counter()
+    with trace_span("load_files", files=len(jobs)):
+        results = {
+            key: _load_station_file(station, export_csv) for key, station in jobs.items()
+        }
+    elapsed = time.perf_counter() - start
+
+    slowest = max((seconds for _, seconds in results.values()), default=0.0)
+    futil.log(
+        f"{CMD_NAME}: loaded {len(jobs)} profile files in {elapsed * 1000.0:.1f} ms "
+        f"(slowest file {slowest * 1000.0:.1f} ms)"
+    )
+    return [results[_station_path_key(station)][0] for station in stations]
+
+
+def _apply_station_load(station, result):
+    points, error, effective_path, correction_note = result
+    if error:
+        return None, station, _format_profile_error(error, station.label)
+    if correction_note and effective_path != station.file_path:
+        ui.messageBox(
+            _format_correction_message(
+                station.label, correction_note, station.file_path, effective_path
+            )
+        )
+        station = station._replace(file_path=effective_path)
+        station.path_input.value = effective_path
+    elif correction_note:
+        _switch_when_written(station.path_input, station.file_path)
+    return points, station, None
+
+
+def _read_resample_options(inputs):
+    count_input = inputs.itemById("resampleStations")
+    count = count_input.value if count_input else 0
+    if count < 2:
+        return 0, COSINE
+    spacing_input = inputs.itemById("resampleSpacing")
+    selected = spacing_input.selectedItem if spacing_input else None
+    spacing = dict(RESAMPLE_SPACINGS).get(selected.name if selected else "", COSINE)
+    return count, spacing
+
+
+def _blend_sections(profiles, mirrors, stations, fractions):
+    return ProfileBlender(profiles, stations=stations, mirrors=mirrors).sections(fractions)
+
+
+def _profile_sections(loaded, blend_count, stations=DEFAULT_BLEND_STATIONS, resampled=False):
+    sections = [
+        _Section(
+            _profile_name_from_path(station.file_path),
+            station.offset,
+            station.angle,
+            run.value,
+            resampled,
+            run.key,
+        )
+        for station, run in loaded
+    ]
+    if blend_count < 1 or len(loaded) < 2:
+        return sections
+
+    # One blender for all stations: the surfaces are resampled once and every
+    # blended section is only a weighted sum of two neighbouring stations. The
+    # result is kept in the stage graph under the station keys, so changing
+    # only offsets or rotations reuses it. The stations are blended before
+    # mirroring, so the blender mirrors each section itself.
+    last = len(loaded) - 1
+    steps = blend_count + 1
+    fractions = [
+        (idx + step / steps) / last for idx in range(last) for step in range(1, steps)
+    ]
+    blended = _stage_graph.cached(
+        "blend",
+        (tuple(section.key for section in sections), stations, steps),
+        _blend_sections,
+        [run.outputs["scale"] for _, run in loaded],
+        [station.mirror for station, _ in loaded],
+        stations,
+        fractions,
+    )
+
+    result = []
+    for idx, section in enumerate(sections[:-1]):
+        result.append(section)
+        following = sections[idx + 1]
+        for step in range(1, steps):
+            weight = step / steps
+            result.append(_Section(
+                f"{section.name} - {following.name} {step}",
+                section.offset + (following.offset - section.offset) * weight,
+                section.angle + (following.angle - section.angle) * weight,
+                blended[idx * blend_count + step - 1],
+                True,
+                ("blend", section.key, following.key, stations, step, steps),
+            ))
+    result.append(sections[-1])
+    return result
+
+
 def start():
     cmd_def = ui.commandDefinitions.addButtonDefinition(
         CMD_ID, CMD_NAME, CMD_DESCRIPTION, ICON_FOLDER
@@ -754,6 +872,8 @@ def start():
 
 
 def stop():
+    _finish_sorted_writes()
+
     workspace = ui.workspaces.itemById(WORKSPACE_ID)
     panel = workspace.toolbarPanels.itemById(PANEL_ID)
     command_control = panel.controls.itemById(CMD_ID)
@@ -790,34 +910,52 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
         plane_input.addSelectionFilter("ConstructionPlanes")
         plane_input.addSelectionFilter("PlanarFaces")
         plane_input.setSelectionLimits(1, 1)
+        inputs.addBoolValueInput("exportSortedCsv", "Save Corrected CSV", True, "", False)
+
+        library_group = inputs.addGroupCommandInput("libraryGroup", "Profile Library")
+        library_group.isExpanded = False
+        library_inputs = library_group.children
+        library_inputs.addStringValueInput("librarySearch", "Search", "")
+        library_inputs.addDropDownCommandInput(
+            "libraryResults", "Profiles", adsk.core.DropDownStyles.TextListDropDownStyle
+        )
+        library_inputs.addIntegerSpinnerCommandInput(
+            "libraryStation", "Use for Profile", 1, DEFAULT_STATIONS, 1, 1
+        )
+        library_inputs.addBoolValueInput("libraryUse", "Use Selected", False, "", False)
+        library_inputs.addBoolValueInput("libraryRescan", "Rescan Folders", False, "", False)
+        _get_library(check=True)
+        _update_library_results(inputs)
 
         units_manager = app.activeProduct.unitsManager if app.activeProduct else None
         default_units = units_manager.defaultLengthUnits if units_manager else "cm"
         default_angle_units = (
             getattr(units_manager, "defaultAngleUnits", "deg") if units_manager else "deg"
         )
-        default_depth = adsk.core.ValueInput.createByString("1")
-        default_offset = adsk.core.ValueInput.createByString("0")
-        default_angle = adsk.core.ValueInput.createByString("0")
-
-        profile1_group = inputs.addGroupCommandInput("profile1Group", "Profile 1")
-        profile1_group.isExpanded = True
-        profile1_inputs = profile1_group.children
-        profile1_inputs.addBoolValueInput("browseCsv", "Browse...", False, "", False)
-        profile1_inputs.addStringValueInput("csvPath", "CSV File", "")
-        profile1_inputs.addValueInput("profileDepth", "Profile Depth", default_units, default_depth)
-        profile1_inputs.addBoolValueInput("mirrorProfile", "Mirror", True, "", False)
-
-        profile2_group = inputs.addGroupCommandInput("profile2Group", "Profile 2")
-        profile2_group.isExpanded = True
-        profile2_inputs = profile2_group.children
-        profile2_inputs.addBoolValueInput("browseCsv2", "Browse...", False, "", False)
-        profile2_inputs.addStringValueInput("csvPath2", "CSV File", "")
-        profile2_inputs.addValueInput("profileDepth2", "Profile Depth", default_units, default_depth)
-        profile2_inputs.addBoolValueInput("mirrorProfile2", "Mirror", True, "", False)
-        profile2_inputs.addValueInput("profileOffset", "Second Profile Offset", default_units, default_offset)
-        profile2_inputs.addValueInput("profileAngle2", "Profile 2 Rotation", default_angle_units, default_angle)
-        profile2_inputs.addBoolValueInput("createSolid", "Create Solid (Loft)", True, "", False)
+        inputs.addIntegerSpinnerCommandInput(
+            "stationCount", "Profiles", 1, MAX_STATIONS, 1, DEFAULT_STATIONS
+        )
+        for index in range(1, MAX_STATIONS + 1):
+            _add_station_group(inputs, index, default_units, default_angle_units)
+        inputs.addIntegerSpinnerCommandInput(
+            "resampleStations", "Resample Points", 0, MAX_RESAMPLE_STATIONS, 10, 0
+        )
+        spacing_input = inputs.addDropDownCommandInput(
+            "resampleSpacing", "Point Spacing", adsk.core.DropDownStyles.TextListDropDownStyle
+        )
+        for index, (name, _) in enumerate(RESAMPLE_SPACINGS):
+            spacing_input.listItems.add(name, index == 0, "")
+        inputs.addIntegerSpinnerCommandInput(
+            "blendSections", "Blended Sections", 0, MAX_BLEND_SECTIONS, 1, 0
+        )
+        inputs.addBoolValueInput("createSolid", "Create Solid (Loft)", True, "", False)
+
+        inputs.addValueInput(
+            "fitTolerance",
+            "Fit Point Tolerance",
+            default_units,
+            adsk.core.ValueInput.createByString("0"),
+        )
 
         futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
         futil.add_handler(args.command.inputChanged, command_input_changed, local_handlers=local_handlers)
@@ -826,96 +964,73 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
         ui.messageBox("Command creation failed:\n{}".format(traceback.format_exc()))
 
 
+def _new_tracer():
+    trace_path = config.PROFILE_TRACE_FILE
+    try:
+        return Tracer(trace_path, memory=config.PROFILE_TRACE_MEMORY)
+    except OSError as exc:
+        futil.log(f"{CMD_NAME}: Unable to write trace file: {exc}")
+        return Tracer(memory=config.PROFILE_TRACE_MEMORY)
+
+
 def command_execute(args: adsk.core.CommandEventArgs):
     futil.log(f'{CMD_NAME} Command Execute Event')
 
+    tracer = _new_tracer()
+    try:
+        with tracing(tracer), trace_span("import"):
+            _import_profiles(args)
+    finally:
+        _finish_sorted_writes(wait=False)
+        if config.DEBUG:
+            futil.log(f"{CMD_NAME}: {tracer.summary()}")
+
+
+def _import_profiles(args):
     inputs = args.command.commandInputs
     plane_input = inputs.itemById("targetPlane")
-    path_input = inputs.itemById("csvPath")
 
     if plane_input.selectionCount < 1:
         ui.messageBox("Select a construction plane or planar face to receive the profile.")
         return
 
-    file_path = path_input.value
-    if not file_path or not os.path.isfile(file_path):
-        ui.messageBox("Select a valid CSV file for profile 1.")
-        return
-
-    depth_input = inputs.itemById("profileDepth")
-    target_depth = depth_input.value
-    if target_depth <= 0:
-        ui.messageBox("Profile depth (profile 1) must be greater than zero.")
-        return
-
-    depth_input2 = inputs.itemById("profileDepth2")
-    target_depth2 = depth_input2.value
-    if target_depth2 <= 0:
-        ui.messageBox("Profile depth (profile 2) must be greater than zero.")
-        return
+    create_solid = inputs.itemById("createSolid").value
+    export_csv = inputs.itemById("exportSortedCsv").value
+    fit_tolerance = max(0.0, inputs.itemById("fitTolerance").value)
+    blend_input = inputs.itemById("blendSections")
+    blend_count = blend_input.value if blend_input else 0
+    resample_count, resample_spacing = _read_resample_options(inputs)
 
-    offset_input = inputs.itemById("profileOffset")
-    offset_value = offset_input.value
-
-    mirror_input = inputs.itemById("mirrorProfile")
-    mirror_profile = mirror_input.value
-    mirror_input2 = inputs.itemById("mirrorProfile2")
-    mirror_profile2 = mirror_input2.value
-    angle_input2 = inputs.itemById("profileAngle2")
-    angle_value2 = angle_input2.value
-    create_solid_input = inputs.itemById("createSolid")
-    create_solid = create_solid_input.value
-
-    path_input2 = inputs.itemById("csvPath2")
-    file_path2 = path_input2.value.strip()
-    has_second = bool(file_path2)
-    if has_second and not os.path.isfile(file_path2):
-        ui.messageBox("Select a valid CSV file for profile 2.")
-        return
-    if not has_second and abs(offset_value) > 1e-9:
-        ui.messageBox("Second profile CSV is required when a non-zero offset is specified.")
-        return
-
-    points, error, effective_path, correction_note = _load_profile_points(
-        file_path, "Profile 1"
-    )
+    stations, error = _read_stations(inputs)
     if error:
         ui.messageBox(error)
         return
-    if correction_note:
-        file_path = effective_path
-        path_input.value = effective_path
-        ui.messageBox(f"Profile 1: {correction_note}\nSaved to:\n{effective_path}")
-    try:
-        points = _scale_points(points, target_depth)
-    except ValueError as exc:
-        ui.messageBox(str(exc))
-        return
-    if mirror_profile:
-        points = [(x_val, -y_val) for x_val, y_val in points]
-    lead_edge = None
-
-    points2 = None
-    if has_second:
-        points2, error, effective_path2, correction_note2 = _load_profile_points(
-            file_path2, "Profile 2"
-        )
+
+    loaded = []
+    results = _load_station_files(stations, export_csv)
+    for station, result in zip(stations, results):
+        points, station, error = _apply_station_load(station, result)
         if error:
             ui.messageBox(error)
             return
-        if correction_note2:
-            file_path2 = effective_path2
-            path_input2.value = effective_path2
-            ui.messageBox(
-                f"Profile 2: {correction_note2}\nSaved to:\n{effective_path2}"
-            )
+        params = {
+            "resample_count": resample_count,
+            "resample_spacing": resample_spacing,
+            "depth": station.depth,
+            "mirror": station.mirror,
+        }
         try:
-            points2 = _scale_points(points2, target_depth2)
-        except ValueError as exc:
-            ui.messageBox(str(exc))
+            run = _stage_graph.run(
+                points,
+                (file_signature(station.file_path), _load_settings()),
+                params,
+                stop="mirror",
+            )
+        except (OSError, ValueError) as exc:
+            ui.messageBox(f"{station.label}: {exc}")
             return
-        if mirror_profile2:
-            points2 = [(x_val, -y_val) for x_val, y_val in points2]
+        _log_stage_run(station.label, run, fit_tolerance)
+        loaded.append((station, run))
 
     selection_entity = plane_input.selection(0).entity
     if not adsk.fusion.ConstructionPlane.cast(selection_entity) and not adsk.fusion.BRepFace.cast(
@@ -930,85 +1045,151 @@ def command_execute(args: adsk.core.CommandEventArgs):
         return
     component = design.activeComponent
 
-    sketch = component.sketches.add(selection_entity)
-    align_angle = _alignment_angle_to_global_z(sketch)
-    lead_edge = _compute_leading_edge(points)
+    try:
+        blend_stations = (
+            station_grid(resample_count, resample_spacing)
+            if resample_count
+            else DEFAULT_BLEND_STATIONS
+        )
+        with trace_span("sections", blend_sections=blend_count):
+            sections = _profile_sections(
+                loaded, blend_count, blend_stations, resampled=bool(resample_count)
+            )
+    except ValueError as exc:
+        ui.messageBox(f"Unable to blend profiles: {exc}")
+        return
+
+    build = _GeometryBuild(design, component, config.PROFILE_BUILD_MODE, sections[0].name)
+    try:
+        _build_profiles(build, selection_entity, sections, fit_tolerance, create_solid)
+    finally:
+        build.finish()
+
 
-    sketch.name = _profile_name_from_path(file_path)
+def _build_profiles(build, selection_entity, sections, fit_tolerance, create_solid):
+    component = build.component
+    root = sections[0]
+    with trace_span("sketch", sketch=root.name):
+        sketch = build.add_sketch(selection_entity, root.name)
+        align_angle = _alignment_angle_to_global_z(sketch)
+    lead_edge = root.points.leading_edge()
 
+    params = {"ordered": root.ordered, "fit_tolerance": fit_tolerance, "align_angle": align_angle}
     try:
-        _draw_profile(sketch, points, align_angle=align_angle)
+        run = _stage_graph.run(root.points, root.key, params, start="split")
+        _log_stage_run(root.name, run, fit_tolerance)
+        _draw_profile(sketch, run.value, build.defers_compute)
     except ValueError as exc:
         ui.messageBox(str(exc))
         return
 
-    if has_second:
-        base_plane = _resolve_plane(selection_entity)
-        offset_plane = _create_offset_plane(component, base_plane, offset_value)
-        sketch2 = component.sketches.add(offset_plane)
-        sketch2.name = _profile_name_from_path(file_path2)
-        align_angle2 = _alignment_angle_to_global_z(sketch2)
-        pivot = _rotate_point_2d(lead_edge, align_angle2)
-        try:
-            _draw_profile(
-                sketch2,
-                points2,
-                rotation_rad=-angle_value2,
-                pivot=pivot,
-                align_angle=align_angle2,
+    sketches = [sketch]
+    outlines = [_surfaces_outline(run.value)]
+    base_plane = _resolve_plane(selection_entity) if len(sections) > 1 else None
+    for section in sections[1:]:
+        with trace_span("sketch", sketch=section.name):
+            offset_plane = _create_offset_plane(
+                component, base_plane, section.offset, build.in_base_feature
             )
+            station_sketch = build.add_sketch(offset_plane, section.name)
+            station_align = _alignment_angle_to_global_z(station_sketch)
+        params = {
+            "ordered": section.ordered,
+            "fit_tolerance": fit_tolerance,
+            "align_angle": station_align,
+            "rotation": -section.angle,
+            "pivot": _rotate_point_2d(lead_edge, station_align),
+        }
+        try:
+            run = _stage_graph.run(section.points, section.key, params, start="split")
+            _log_stage_run(section.name, run, fit_tolerance)
+            _draw_profile(station_sketch, run.value, build.defers_compute)
         except ValueError as exc:
             ui.messageBox(str(exc))
             return
+        sketches.append(station_sketch)
+        outlines.append(_surfaces_outline(run.value))
+
+    build.finish_sketches()
+    if create_solid and len(sketches) > 1:
+        with trace_span("profile_detection", sketches=len(sketches)):
+            profiles = [
+                _get_primary_profile(station_sketch, outline)
+                for station_sketch, outline in zip(sketches, outlines)
+            ]
+        if not all(profiles):
+            ui.messageBox("Unable to create loft: missing closed profile.")
+            return
 
-        if create_solid:
-            profile1 = _get_primary_profile(sketch)
-            profile2 = _get_primary_profile(sketch2)
-            if not profile1 or not profile2:
-                ui.messageBox("Unable to create loft: missing closed profile.")
-                return
-
-            loft_features = component.features.loftFeatures
-            loft_input = loft_features.createInput(
-                adsk.fusion.FeatureOperations.NewBodyFeatureOperation
-            )
-            loft_input.isSolid = True
-            loft_input.loftSections.add(profile1)
-            loft_input.loftSections.add(profile2)
+        loft_features = component.features.loftFeatures
+        loft_input = loft_features.createInput(
+            adsk.fusion.FeatureOperations.NewBodyFeatureOperation
+        )
+        loft_input.isSolid = True
+        for profile in profiles:
+            loft_input.loftSections.add(profile)
+        with trace_span("loft", sections=len(profiles)):
             loft_features.add(loft_input)
-            sketch.isVisible = False
-            sketch2.isVisible = False
+        for station_sketch in sketches:
+            station_sketch.isVisible = False
 
 
 def command_input_changed(args: adsk.core.InputChangedEventArgs):
+    _finish_sorted_writes(wait=False)
     changed_input = args.input
-    if changed_input.id not in {"browseCsv", "browseCsv2"}:
+    command_inputs = changed_input.parentCommand.commandInputs
+    if changed_input.id == "stationCount":
+        station_count = changed_input.value
+        for index in range(1, MAX_STATIONS + 1):
+            group = command_inputs.itemById(f"profile{index}Group")
+            if group:
+                group.isVisible = index <= station_count
+        library_station = command_inputs.itemById("libraryStation")
+        if library_station:
+            library_station.maximumValue = station_count
+            library_station.value = min(library_station.value, station_count)
+        return
+    if changed_input.id == "librarySearch":
+        _update_library_results(command_inputs)
+        return
+    if changed_input.id == "libraryRescan":
+        _get_library(rescan=True)
+        _update_library_results(command_inputs)
+        changed_input.value = False
+        return
+    if changed_input.id == "libraryUse":
+        results_input = command_inputs.itemById("libraryResults")
+        selected = results_input.selectedItem if results_input else None
+        if selected and selected.index < len(_library_results):
+            index = command_inputs.itemById("libraryStation").value
+            station_count = command_inputs.itemById("stationCount").value
+            if index > station_count:
+                ui.messageBox(
+                    f"Profile {index} is not shown. Choose a profile from 1 to {station_count}."
+                )
+            else:
+                _select_station_file(
+                    command_inputs, index, _library_results[selected.index].path
+                )
+        changed_input.value = False
+        return
+    if not changed_input.id.startswith("browseCsv"):
         return
 
     file_dialog = ui.createFileDialog()
-    file_dialog.title = "Select CSV airfoil profile"
-    file_dialog.filter = "CSV Files (*.csv)"
+    file_dialog.title = "Select airfoil profile"
+    file_dialog.filter = (
+        "Airfoil Profiles (*.csv *.dat);;CSV Files (*.csv);;Selig/Lednicer Files (*.dat)"
+    )
     file_dialog.filterIndex = 0
 
     if file_dialog.showOpen() != adsk.core.DialogResults.DialogOK:
         return
 
-    path_id = "csvPath" if changed_input.id == "browseCsv" else "csvPath2"
-    path_input = args.inputs.itemById(path_id)
-    if path_input:
-        path_input.value = file_dialog.filename
-        label = "Profile 1" if changed_input.id == "browseCsv" else "Profile 2"
-        _, error, effective_path, correction_note = _load_profile_points(
-            file_dialog.filename, label
-        )
-        if error:
-            ui.messageBox(error)
-            path_input.value = ""
-            changed_input.value = False
-            return
-        path_input.value = effective_path
-        if correction_note:
-            ui.messageBox(f"{label}: {correction_note}\nSaved to:\n{effective_path}")
+    index = _station_index(changed_input.id, "browseCsv")
+    if _select_station_file(command_inputs, index, file_dialog.filename):
+        _get_library(folder=os.path.dirname(file_dialog.filename))
+        _update_library_results(command_inputs)
 
     changed_input.value = False
 
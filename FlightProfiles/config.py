@@ -23,5 +23,59 @@ try:
 except Exception:
     VERSION = '0.0.0'
 
+# Store normalized profiles as binary sidecar files (.flightprofiles folder
+# next to the CSV) so validated profiles load without parsing. Corrected
+# "_sort" CSV files are only written when requested in the dialog.
+PROFILE_SIDECAR = True
+
+# Write corrected "_sort" CSV files on a background thread, so the import
+# goes on while they are saved. The source file stays selected until its
+# "_sort" file exists. Unchanged files are never rewritten.
+PROFILE_WRITE_IN_BACKGROUND = False
+
+# Profile files of at least PROFILE_STREAM_BYTES, such as CSV exports of 3D
+# scans, are read in blocks instead of at once. While reading, one row per
+# cell of a coarsening grid is kept so that at most PROFILE_STREAM_MAX_POINTS
+# remain (None keeps all), and with PROFILE_STREAM_RESOLUTION (model units,
+# None = off) at most one row per square of this size is kept. The leading
+# and trailing edge rows are always kept. The rows per second are logged.
+PROFILE_STREAM_BYTES = 4 * 2 ** 20
+PROFILE_STREAM_MAX_POINTS = 20000
+PROFILE_STREAM_RESOLUTION = None
+
+# How the points of CSV files are put in order. "x_groups" sorts interleaved
+# upper and lower points that share their x stations. "nearest" chains the
+# points by nearest neighbour around the contour, for scanned or otherwise
+# unordered point clouds whose surfaces share no stations. Selig and Lednicer
+# .dat files keep the order of their layout.
+PROFILE_ORDERING = "x_groups"
+
+# How the planes, sketches and loft of one import enter the timeline.
+# "timeline" adds each one as its own entry and solves every sketch as soon
+# as it is drawn. "group" puts all of them in one collapsed timeline group,
+# and "base_feature" builds the planes and sketches inside one base feature,
+# which is not recomputed parametrically, followed by the loft. With both,
+# the sketches are solved together once the last one is drawn, which saves
+# time for wings with many stations in large designs.
+PROFILE_BUILD_MODE = "timeline"
+
+# Every import is traced in spans (read, parse, normalize, validate, write
+# correction, each processing step, sketch, spline, profile detection, loft).
+# The spans are written to this Chrome trace file while the import runs, so
+# after an import hangs the last unfinished span shows where it is stuck.
+# None turns the file off. PROFILE_TRACE_MEMORY adds tracemalloc peaks and
+# slows the import down. With DEBUG on, a one-line summary is logged.
+PROFILE_TRACE_FILE = os.path.join(os.path.dirname(__file__), '.flightprofiles', 'trace.json')
+PROFILE_TRACE_MEMORY = False
+
+# Profile library searched from the import dialog. The folders listed here
+# are indexed with their subfolders, the folders a profile was browsed from
+# without them. The index is kept in the add-in's .flightprofiles folder; it
+# is rescanned on dialog start only when a folder gained or lost files, and
+# only files with a new timestamp or size are read again.
+PROFILE_LIBRARY_FOLDERS = []
+PROFILE_LIBRARY_INDEX = os.path.join(os.path.dirname(__file__), '.flightprofiles', 'library.json')
+PROFILE_LIBRARY_RESULTS = 50
+
 # Palettes
 sample_palette_id = f'{COMPANY_NAME}_{ADDIN_NAME}_palette_id'
@@ -0,0 +1,93 @@
+# Fusion-independent profile processing shared by the add-in commands and
+# the headless tools. Nothing in this package may import adsk.
+# The command-line modules (profile_batch, profile_library) are not imported
+# here, so `python -m` does not find them already loaded; import them
+# directly.
+
+from .profile_array import HAS_NUMPY, ProfileArray, SortedProfile
+from .profile_blend import DEFAULT_BLEND_STATIONS, ProfileBlender, blend_profiles
+from .profile_cache import (
+    FileSignature,
+    ProfileCache,
+    content_hash,
+    file_content_hash,
+    file_signature,
+    profile_digest,
+)
+from .profile_dat import parse_lednicer_text, parse_selig_text
+from .profile_decimate import DecimationResult, decimate_profile_surfaces, decimate_surface
+from .profile_dedupe import DEDUPE_TOLERANCE, DedupeResult, remove_near_duplicates
+from .profile_diagnostics import (
+    Diagnostic,
+    ProfileDiagnostics,
+    diagnose_profile_sequence,
+)
+from .profile_files import PROFILE_PATTERNS, find_profile_files, walk_profile_folders
+from .profile_order import NEAREST, ORDERINGS, X_GROUPS, order_point_cloud
+from .profile_pack import ProfilePack
+from .profile_pipeline import (
+    cleanup_trailing_edge,
+    is_interleaved_profile,
+    normalize_profile,
+    normalize_profile_points,
+    sort_interleaved_profile,
+    trailing_edge_duplicate_count,
+    validate_profile_sequence,
+)
+from .profile_polygon import (
+    BOX_TOLERANCE,
+    OutlineProperties,
+    matching_boxes,
+    outline_properties,
+    surfaces_outline,
+)
+from .profile_reader import (
+    CSV,
+    DAT_FORMAT,
+    DEFAULT_FORMAT,
+    LEDNICER,
+    ORDERED_LAYOUTS,
+    SELIG,
+    STREAM_CHUNK_BYTES,
+    ProfileFormat,
+    ProfileReader,
+    StreamResult,
+    find_reader,
+    parse_profile_data,
+    parse_profile_text,
+    profile_extensions,
+    read_profile,
+    register_reader,
+    stream_profile_file,
+)
+from .profile_resample import (
+    COSINE,
+    HALF_COSINE,
+    SPACINGS,
+    UNIFORM,
+    clear_station_grids,
+    interpolate,
+    interpolation_weights,
+    resample_profile,
+    resample_surface,
+    station_grid,
+)
+from .profile_split import group_by_x, split_at_leading_edge, split_profile
+from .profile_stages import (
+    PROFILE_STAGES,
+    STAGE_DEFAULTS,
+    ProfileSurfaces,
+    Stage,
+    StageGraph,
+    StageRun,
+    profile_stage_graph,
+)
+from .profile_store import SidecarProfile, read_sidecar, sidecar_path, write_sidecar
+from .profile_trace import Span, Tracer, trace_span, tracing
+from .profile_writer import (
+    SortedProfileFile,
+    format_sorted_profile,
+    sorted_profile_path,
+    write_file_if_changed,
+    write_sorted_profile_file,
+)
@@ -0,0 +1,260 @@
+# Contiguous float64 storage for profile points.
+# Uses NumPy when it is available and falls back to array('d') otherwise, so
+# the add-in keeps working inside the Python that ships with Fusion.
+
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+def _new_buffer(values=()):
+    if HAS_NUMPY:
+        return np.asarray(values, dtype=np.float64)
+    if isinstance(values, array) and values.typecode == "d":
+        return values
+    if isinstance(values, memoryview) and values.format == "d":
+        return values
+    return array("d", values)
+
+
+class ProfileArray:
+    """Immutable sequence of (x, y) points backed by two float64 buffers."""
+
+    # Slices are views that share the parent's buffers (NumPy views or
+    # strided memoryviews), so splitting a contour into its surfaces does
+    # not copy any points.
+
+    __slots__ = ("_xs", "_ys", "_bounds", "_sorted")
+
+    def __init__(self, xs=(), ys=()):
+        self._xs = _new_buffer(xs)
+        self._ys = _new_buffer(ys)
+        if len(self._xs) != len(self._ys):
+            raise ValueError("X and Y buffers must have the same length.")
+        self._bounds = None
+        self._sorted = None
+
+    @classmethod
+    def from_points(cls, points):
+        if isinstance(points, cls):
+            return points
+        xs = array("d")
+        ys = array("d")
+        for x_val, y_val in points:
+            xs.append(x_val)
+            ys.append(y_val)
+        return cls(xs, ys)
+
+    @property
+    def xs(self):
+        return self._xs
+
+    @property
+    def ys(self):
+        return self._ys
+
+    def __len__(self):
+        return len(self._xs)
+
+    def __bool__(self):
+        return len(self._xs) > 0
+
+    def __iter__(self):
+        if HAS_NUMPY:
+            return zip(self._xs.tolist(), self._ys.tolist())
+        return zip(self._xs, self._ys)
+
+    def __reversed__(self):
+        if HAS_NUMPY:
+            return zip(self._xs[::-1].tolist(), self._ys[::-1].tolist())
+        return zip(reversed(self._xs), reversed(self._ys))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if HAS_NUMPY:
+                return ProfileArray(self._xs[index], self._ys[index])
+            return ProfileArray(memoryview(self._xs)[index], memoryview(self._ys)[index])
+        return (float(self._xs[index]), float(self._ys[index]))
+
+    def __add__(self, other):
+        other = ProfileArray.from_points(other)
+        if HAS_NUMPY:
+            return ProfileArray(
+                np.concatenate((self._xs, other._xs)),
+                np.concatenate((self._ys, other._ys)),
+            )
+        xs = array("d", self._xs)
+        ys = array("d", self._ys)
+        xs.extend(other._xs)
+        ys.extend(other._ys)
+        return ProfileArray(xs, ys)
+
+    def __eq__(self, other):
+        if isinstance(other, ProfileArray):
+            return len(self) == len(other) and list(self) == list(other)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    # Views are pickled with their own copy of the points.
+    def __reduce__(self):
+        if HAS_NUMPY:
+            return ProfileArray, (self._xs, self._ys)
+        return ProfileArray, (array("d", self._xs), array("d", self._ys))
+
+    def __repr__(self):
+        return f"ProfileArray({len(self)} points)"
+
+    def to_list(self):
+        return list(self)
+
+    def bounds(self):
+        if self._bounds is None:
+            if not len(self._xs):
+                raise ValueError("Profile has no points.")
+            if HAS_NUMPY:
+                self._bounds = (
+                    float(self._xs.min()),
+                    float(self._xs.max()),
+                    float(self._ys.min()),
+                    float(self._ys.max()),
+                )
+            else:
+                self._bounds = (min(self._xs), max(self._xs), min(self._ys), max(self._ys))
+        return self._bounds
+
+    def take(self, indices):
+        if HAS_NUMPY:
+            return ProfileArray(self._xs[indices], self._ys[indices])
+        return ProfileArray(
+            array("d", [self._xs[idx] for idx in indices]),
+            array("d", [self._ys[idx] for idx in indices]),
+        )
+
+    def sorted_profile(self):
+        if self._sorted is None:
+            self._sorted = SortedProfile(self)
+        return self._sorted
+
+    def argmin_x(self):
+        return self.sorted_profile().le_index
+
+    def argmax_x(self):
+        return self.sorted_profile().te_index
+
+    def tolerances(self):
+        x_min, x_max, y_min, y_max = self.bounds()
+        chord = x_max - x_min
+        if chord <= 0:
+            return None
+
+        max_abs_y = max(abs(y_min), abs(y_max))
+        x_tol = max(chord * 1e-6, 1e-9)
+        y_tol = max(max_abs_y * 1e-4, chord * 1e-6, 1e-9)
+        return x_min, x_max, chord, x_tol, y_tol
+
+    def scaled(self, target_depth):
+        min_x, max_x, _, _ = self.bounds()
+        chord = max_x - min_x
+        if chord <= 0:
+            raise ValueError("Invalid profile data: chord length is zero.")
+
+        scale = target_depth / chord
+        if HAS_NUMPY:
+            return ProfileArray((self._xs - min_x) * scale + min_x, self._ys * scale)
+        return ProfileArray(
+            array("d", [(x_val - min_x) * scale + min_x for x_val in self._xs]),
+            array("d", [y_val * scale for y_val in self._ys]),
+        )
+
+    def mirrored(self):
+        if HAS_NUMPY:
+            return ProfileArray(self._xs, -self._ys)
+        return ProfileArray(self._xs, array("d", [-y_val for y_val in self._ys]))
+
+    def rotated(self, angle_rad, pivot=(0.0, 0.0)):
+        if abs(angle_rad) < 1e-12:
+            return self
+
+        cos_a = math.cos(angle_rad)
+        sin_a = math.sin(angle_rad)
+        px, py = pivot
+        if HAS_NUMPY:
+            dx = self._xs - px
+            dy = self._ys - py
+            return ProfileArray(px + dx * cos_a - dy * sin_a, py + dx * sin_a + dy * cos_a)
+
+        rx = array("d")
+        ry = array("d")
+        for x_val, y_val in zip(self._xs, self._ys):
+            dx = x_val - px
+            dy = y_val - py
+            rx.append(px + dx * cos_a - dy * sin_a)
+            ry.append(py + dx * sin_a + dy * cos_a)
+        return ProfileArray(rx, ry)
+
+    def leading_edge(self, x_tol=1e-6):
+        min_x = self.sorted_profile().x_min
+        if HAS_NUMPY:
+            near_le = self._ys[np.abs(self._xs - min_x) <= x_tol]
+            if not len(near_le):
+                return min_x, 0.0
+            return min_x, float(near_le.mean())
+
+        near_le = [
+            y_val for x_val, y_val in zip(self._xs, self._ys) if abs(x_val - min_x) <= x_tol
+        ]
+        if not near_le:
+            return min_x, 0.0
+        return min_x, sum(near_le) / len(near_le)
+
+
+class SortedProfile:
+    """X-order index of a ProfileArray, built once and shared by all helpers."""
+
+    __slots__ = ("points", "le_index", "te_index", "x_min", "x_max", "_order")
+
+    def __init__(self, points):
+        xs = points.xs
+        if not len(xs):
+            raise ValueError("Profile has no points.")
+        if HAS_NUMPY:
+            self.le_index = int(xs.argmin())
+            self.te_index = int(xs.argmax())
+        else:
+            self.le_index = min(range(len(xs)), key=xs.__getitem__)
+            self.te_index = max(range(len(xs)), key=xs.__getitem__)
+        self.points = points
+        self.x_min = float(xs[self.le_index])
+        self.x_max = float(xs[self.te_index])
+        self._order = None
+
+    # The permutation is only built when a helper needs the sorted points.
+    # It is stable, so points with equal x keep their contour order.
+    @property
+    def order(self):
+        if self._order is None:
+            xs = self.points.xs
+            if HAS_NUMPY:
+                self._order = np.argsort(xs, kind="stable")
+            else:
+                self._order = array("l", sorted(range(len(xs)), key=xs.__getitem__))
+        return self._order
+
+    def sorted_points(self):
+        return self.points.take(self.order)
+
+    # Points of points[start:stop] sorted by x, read off the shared order.
+    def sorted_range(self, start=0, stop=None):
+        if stop is None:
+            stop = len(self.points)
+        order = self.order
+        if HAS_NUMPY:
+            return self.points.take(order[(order >= start) & (order < stop)])
+        return self.points.take([idx for idx in order if start <= idx < stop])
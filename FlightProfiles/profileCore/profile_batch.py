@@ -0,0 +1,149 @@
+# Headless batch validator for profile libraries.
+# Runs the same parse/normalize/validate pipeline as the import dialog over
+# whole directory trees and writes a JSON report.
+#
+# Usage (from the repository root):
+#   python -m FlightProfiles.profileCore.profile_batch Profiles --output report.json
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .profile_cache import content_hash, profile_digest
+from .profile_files import PROFILE_PATTERNS, find_profile_files
+from .profile_order import ORDERINGS, X_GROUPS
+from .profile_pipeline import normalize_profile
+from .profile_reader import ORDERED_LAYOUTS, parse_profile_data
+from .profile_store import write_sidecar
+from .profile_writer import write_sorted_profile_file
+
+
+def check_profile_file(file_path, write_sorted=False, write_sidecars=False, ordering=X_GROUPS):
+    result = {
+        "path": file_path,
+        "status": "failed",
+        "points": 0,
+        "corrections": [],
+        "error": None,
+        "diagnostics": [],
+    }
+    try:
+        with open(file_path, "rb") as handle:
+            data = handle.read()
+    except OSError as exc:
+        result["error"] = f"Unable to read CSV file: {exc}"
+        return result
+
+    # A file that does not decode fails on its own instead of aborting the
+    # worker pool and with it the whole report.
+    try:
+        points, profile_format = parse_profile_data(data, file_path)
+        result["points"] = len(points)
+        points, diagnostics, corrections = normalize_profile(
+            points, profile_format.layout in ORDERED_LAYOUTS, ordering
+        )
+    except ValueError as exc:
+        result["error"] = f"Unable to parse profile file: {exc}"
+        return result
+    result["corrections"] = corrections
+    result["diagnostics"] = diagnostics.to_dicts()
+    if not diagnostics.ok:
+        result["error"] = diagnostics.first_error()
+        return result
+
+    result["status"] = "corrected" if corrections else "valid"
+    result["points"] = len(points)
+    try:
+        if write_sidecars:
+            digest = profile_digest(content_hash(data), ordering)
+            write_sidecar(file_path, digest, points, corrections, profile_format)
+        if write_sorted and corrections:
+            sorted_file = write_sorted_profile_file(file_path, points, profile_format)
+            result["sorted_path"] = sorted_file.path
+            result["sorted_written"] = sorted_file.written
+    except OSError as exc:
+        result["status"] = "failed"
+        result["error"] = f"Unable to write corrected profile: {exc}"
+    return result
+
+
+def _check_profile_args(args):
+    return check_profile_file(*args)
+
+
+def run_batch(file_paths, workers=None, write_sorted=False, write_sidecars=False,
+              ordering=X_GROUPS):
+    jobs = [(path, write_sorted, write_sidecars, ordering) for path in file_paths]
+    if workers == 1 or len(jobs) < 2:
+        return [_check_profile_args(job) for job in jobs]
+
+    worker_count = workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (worker_count * 4))
+    with ProcessPoolExecutor(max_workers=worker_count) as executor:
+        return list(executor.map(_check_profile_args, jobs, chunksize=chunksize))
+
+
+def build_report(results, elapsed):
+    summary = {"files": len(results), "valid": 0, "corrected": 0, "failed": 0}
+    for result in results:
+        summary[result["status"]] += 1
+    summary["seconds"] = round(elapsed, 4)
+    return {"summary": summary, "files": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Validate and normalize airfoil profile files without Fusion."
+    )
+    parser.add_argument("paths", nargs="+", help="Profile files or directories to scan.")
+    parser.add_argument(
+        "--pattern",
+        action="append",
+        help="File name pattern to include (default: *.csv and *.dat). May be repeated.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument(
+        "--write-sorted", action="store_true", help="Write _sort CSV files for corrected profiles."
+    )
+    parser.add_argument(
+        "--sidecar", action="store_true", help="Write binary sidecar files for valid profiles."
+    )
+    parser.add_argument(
+        "--ordering",
+        choices=ORDERINGS,
+        default=X_GROUPS,
+        help="How unordered CSV points are put in order (nearest: chain scanned point clouds).",
+    )
+    args = parser.parse_args(argv)
+
+    file_paths = find_profile_files(args.paths, tuple(args.pattern or PROFILE_PATTERNS))
+    start = time.perf_counter()
+    results = run_batch(
+        file_paths, args.workers, args.write_sorted, args.sidecar, args.ordering
+    )
+    report = build_report(results, time.perf_counter() - start)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text)
+            handle.write("\n")
+    else:
+        print(text)
+
+    summary = report["summary"]
+    print(
+        f"{summary['files']} files: {summary['valid']} valid, "
+        f"{summary['corrected']} corrected, {summary['failed']} failed "
+        f"({summary['seconds']} s)",
+        file=sys.stderr,
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
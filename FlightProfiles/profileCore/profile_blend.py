@@ -0,0 +1,159 @@
+# Blend airfoils along the span (Profilstrak).
+# Every validated source profile is split into its surfaces at the leading
+# edge, and both surfaces are resampled once onto shared chordwise stations
+# given as chord fractions. The resampled coordinates are kept, so each
+# blended section afterwards is only a weighted sum of two rows. Chord length
+# and leading-edge position are blended together with the shape, so tapered
+# stations blend as well.
+# Sources sit at span fractions from 0 (first) to 1 (last), evenly spaced
+# unless given, and sections come out trailing edge upper first.
+# Mirrored stations are passed unmirrored with their mirror flag, and the
+# blended section is mirrored afterwards; blending a mirrored station with an
+# unmirrored one would mix the upper surface of one with the lower of the
+# other, so neighbours must share the flag.
+
+from array import array
+from bisect import bisect_right
+
+from .profile_array import HAS_NUMPY, ProfileArray, np
+from .profile_resample import resample_surface, station_grid
+from .profile_split import split_at_leading_edge
+
+DEFAULT_BLEND_STATIONS = 81
+
+
+class _BlendSource:
+    __slots__ = ("x_min", "chord", "rows")
+
+    def __init__(self, points, stations):
+        points = ProfileArray.from_points(points)
+        tolerances = points.tolerances() if len(points) else None
+        if not tolerances:
+            raise ValueError("Invalid profile data: chord length is zero.")
+        self.x_min, _, self.chord, _, _ = tolerances
+
+        lower_pts, upper_pts = split_at_leading_edge(points)
+        if len(lower_pts) < 2 or len(upper_pts) < 2:
+            raise ValueError("Not enough points to build upper and lower curves.")
+        upper = resample_surface(upper_pts, stations)
+        lower = resample_surface(lower_pts, stations)
+
+        # Upper x, upper y, lower x, lower y in chord units, end to end.
+        if HAS_NUMPY:
+            self.rows = np.concatenate((
+                (upper.xs - self.x_min) / self.chord,
+                upper.ys / self.chord,
+                (lower.xs - self.x_min) / self.chord,
+                lower.ys / self.chord,
+            ))
+        else:
+            self.rows = array("d")
+            for values, offset in (
+                (upper.xs, self.x_min), (upper.ys, 0.0), (lower.xs, self.x_min), (lower.ys, 0.0)
+            ):
+                self.rows.extend((value - offset) / self.chord for value in values)
+
+
+class ProfileBlender:
+    """Blend two or more profiles at span fractions between 0 and 1."""
+
+    def __init__(
+        self, profiles, span_fractions=None, stations=DEFAULT_BLEND_STATIONS, mirrors=None
+    ):
+        if len(profiles) < 2:
+            raise ValueError("At least two profiles are required for blending.")
+        mirrors = [bool(value) for value in mirrors] if mirrors is not None else None
+        if mirrors is not None and len(mirrors) != len(profiles):
+            raise ValueError("Each profile needs exactly one mirror flag.")
+        for idx in range(len(profiles) - 1 if mirrors else 0):
+            if mirrors[idx] != mirrors[idx + 1]:
+                raise ValueError(
+                    f"Profiles {idx + 1} and {idx + 2} cannot be blended: "
+                    "only one of them is mirrored."
+                )
+        if span_fractions is None:
+            last = len(profiles) - 1
+            span_fractions = [idx / last for idx in range(len(profiles))]
+        span_fractions = [float(value) for value in span_fractions]
+        if len(span_fractions) != len(profiles):
+            raise ValueError("Each profile needs exactly one span fraction.")
+        if any(b <= a for a, b in zip(span_fractions, span_fractions[1:])):
+            raise ValueError("Span fractions must be strictly increasing.")
+
+        if isinstance(stations, int):
+            stations = station_grid(stations)
+        self.stations = tuple(stations)
+        self.span_fractions = span_fractions
+        self.mirrors = mirrors or [False] * len(profiles)
+        self._sources = [_BlendSource(points, self.stations) for points in profiles]
+
+        if HAS_NUMPY:
+            self._rows = np.vstack([source.rows for source in self._sources])
+            self._x_min = np.array([source.x_min for source in self._sources])
+            self._chord = np.array([source.chord for source in self._sources])
+
+    def __len__(self):
+        return len(self._sources)
+
+    def _span_weights(self, fraction):
+        positions = self.span_fractions
+        idx = min(max(bisect_right(positions, fraction) - 1, 0), len(positions) - 2)
+        start, end = positions[idx], positions[idx + 1]
+        weight = min(1.0, max(0.0, (fraction - start) / (end - start)))
+        return idx, weight
+
+    def _contour(self, x_min, chord, rows, mirror):
+        count = len(self.stations)
+        upper = ProfileArray(rows[:count], rows[count:2 * count])
+        lower = ProfileArray(rows[2 * count:3 * count], rows[3 * count:])
+        if upper[0] == lower[0]:
+            lower = lower[1:]
+        contour = upper[::-1] + lower
+        if HAS_NUMPY:
+            contour = ProfileArray(x_min + contour.xs * chord, contour.ys * chord)
+        else:
+            contour = ProfileArray(
+                array("d", [x_min + x_val * chord for x_val in contour.xs]),
+                array("d", [y_val * chord for y_val in contour.ys]),
+            )
+        return contour.mirrored() if mirror else contour
+
+    def section(self, fraction):
+        return self.sections([fraction])[0]
+
+    def sections(self, fractions):
+        if not len(fractions):
+            return []
+
+        pairs = [self._span_weights(float(fraction)) for fraction in fractions]
+        if HAS_NUMPY:
+            weights = np.zeros((len(pairs), len(self._sources)))
+            for row, (idx, weight) in enumerate(pairs):
+                weights[row, idx] = 1.0 - weight
+                weights[row, idx + 1] = weight
+            rows = weights @ self._rows
+            x_mins = weights @ self._x_min
+            chords = weights @ self._chord
+            return [
+                self._contour(
+                    float(x_mins[row]), float(chords[row]), rows[row], self.mirrors[pairs[row][0]]
+                )
+                for row in range(len(pairs))
+            ]
+
+        results = []
+        for idx, weight in pairs:
+            first = self._sources[idx]
+            second = self._sources[idx + 1]
+            keep = 1.0 - weight
+            rows = array("d", [a * keep + b * weight for a, b in zip(first.rows, second.rows)])
+            x_min = first.x_min * keep + second.x_min * weight
+            chord = first.chord * keep + second.chord * weight
+            results.append(self._contour(x_min, chord, rows, self.mirrors[idx]))
+        return results
+
+
+def blend_profiles(
+    profiles, fractions, span_fractions=None, stations=DEFAULT_BLEND_STATIONS, mirrors=None
+):
+    return ProfileBlender(profiles, span_fractions, stations, mirrors).sections(fractions)
@@ -0,0 +1,118 @@
+# Bounded LRU cache for loaded profiles.
+# Entries are keyed by path and content hash. A path whose mtime and size
+# are unchanged is served from a stat() call alone; a file that was touched
+# but not changed is recognised by its hash and skips the re-parse.
+# The cache is shared by the threads that load profiles concurrently, so
+# every method holds the cache lock.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from .profile_order import X_GROUPS
+
+FileSignature = namedtuple("FileSignature", ["path", "mtime_ns", "size"])
+
+
+def file_signature(file_path):
+    stat = os.stat(file_path)
+    path = os.path.normcase(os.path.abspath(file_path))
+    return FileSignature(path, stat.st_mtime_ns, stat.st_size)
+
+
+def content_hash(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+# Same digest as content_hash() of the whole file, read in blocks.
+def file_content_hash(file_path, chunk_size=2 ** 20):
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Key of the profile a file normalizes to. Other orderings than the default
+# x grouping can give other points, so they are part of the key.
+def profile_digest(digest, ordering=X_GROUPS):
+    if ordering == X_GROUPS:
+        return digest
+    return content_hash(f"{digest}:{ordering}".encode("ascii"))
+
+
+class ProfileCache:
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._signatures = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _touch(self, key):
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def get(self, signature):
+        with self._lock:
+            known = self._signatures.get(signature.path)
+            if known is not None and known[:2] == (signature.mtime_ns, signature.size):
+                key = (signature.path, known[2])
+                if key in self._entries:
+                    return self._touch(key)
+            return None
+
+    def get_by_hash(self, signature, digest):
+        key = (signature.path, digest)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._signatures[signature.path] = (signature.mtime_ns, signature.size, digest)
+            return self._touch(key)
+
+    def put(self, signature, digest, value):
+        key = (signature.path, digest)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._signatures[signature.path] = (signature.mtime_ns, signature.size, digest)
+            while len(self._entries) > self.max_entries:
+                (path, old_digest), _ = self._entries.popitem(last=False)
+                known = self._signatures.get(path)
+                if known is not None and known[2] == old_digest:
+                    del self._signatures[path]
+
+    def replace(self, signature, value):
+        with self._lock:
+            known = self._signatures.get(signature.path)
+            if known is not None:
+                self._entries[(signature.path, known[2])] = value
+
+    def discard(self, signature):
+        with self._lock:
+            known = self._signatures.pop(signature.path, None)
+            if known is not None:
+                self._entries.pop((signature.path, known[2]), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._signatures.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
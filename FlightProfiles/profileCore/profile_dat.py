@@ -0,0 +1,114 @@
+# Readers for the two ".dat" layouts most public airfoil data ships in.
+# Selig: a name line, then one loop from the trailing edge over the upper
+# surface to the leading edge and back along the lower surface.
+# Lednicer: a name line, a line with the upper and lower point counts, then
+# the upper and the lower surface, each from the leading to the trailing edge.
+# Both are returned in the Selig order the pipeline validates, so they never
+# go through the interleaved-point sorting.
+
+from array import array
+from itertools import chain
+
+from .profile_array import ProfileArray
+
+SNIFF_LINES = 4
+
+
+def _numbers(line):
+    try:
+        return [float(part) for part in line.split()]
+    except ValueError:
+        return None
+
+
+def _is_point(line):
+    if "," in line or ";" in line:
+        return False
+    values = _numbers(line)
+    return values is not None and len(values) == 2
+
+
+def _is_count_line(line):
+    values = _numbers(line)
+    return (
+        values is not None
+        and len(values) == 2
+        and all(value >= 2 and value == int(value) for value in values)
+    )
+
+
+def sniff_selig(lines):
+    return (
+        len(lines) >= 2
+        and not _is_point(lines[0])
+        and _is_point(lines[1])
+        and not _is_count_line(lines[1])
+    )
+
+
+def sniff_lednicer(lines):
+    return len(lines) >= 3 and _is_count_line(lines[1]) and _is_point(lines[2])
+
+
+def _data_lines(text):
+    return [line for line in (raw.strip() for raw in text.splitlines()) if line]
+
+
+# All coordinates of the lines as (xs, ys). When every line holds exactly
+# two tokens, all of them are converted in one pass; otherwise each line is
+# read on its own, taking x and y from its first two numbers and skipping
+# lines that have fewer.
+def _coordinates(lines):
+    rows = list(map(str.split, lines))
+    if all(len(row) == 2 for row in rows):
+        try:
+            values = array("d", map(float, chain.from_iterable(rows)))
+        except ValueError:
+            values = None
+        if values is not None:
+            return values[0::2], values[1::2]
+
+    xs = array("d")
+    ys = array("d")
+    for line in lines:
+        values = _numbers(line)
+        if values is not None and len(values) >= 2:
+            xs.append(values[0])
+            ys.append(values[1])
+    return xs, ys
+
+
+def parse_selig_text(text):
+    lines = _data_lines(text)
+    if lines and not _is_point(lines[0]):
+        lines = lines[1:]
+    xs, ys = _coordinates(lines)
+    return ProfileArray(xs, ys)
+
+
+# The coordinate lines of a Lednicer file, without the name and count lines.
+def lednicer_point_lines(text):
+    lines = _data_lines(text)
+    if len(lines) >= 2 and _is_count_line(lines[1]):
+        return lines[2:]
+    return lines
+
+
+# None when the counts do not match the points that follow.
+def parse_lednicer_text(text):
+    lines = _data_lines(text)
+    if len(lines) < 3 or not _is_count_line(lines[1]):
+        return None
+    upper_count, lower_count = (int(value) for value in _numbers(lines[1]))
+    xs, ys = _coordinates(lines[2:])
+    if len(xs) != upper_count + lower_count:
+        return None
+
+    # Upper surface reversed to run trailing edge to leading edge, then the
+    # lower surface without its first point when both share the leading edge.
+    lower_start = upper_count
+    if (xs[0], ys[0]) == (xs[upper_count], ys[upper_count]):
+        lower_start += 1
+    out_xs = xs[upper_count - 1::-1] + xs[lower_start:]
+    out_ys = ys[upper_count - 1::-1] + ys[lower_start:]
+    return ProfileArray(out_xs, out_ys)
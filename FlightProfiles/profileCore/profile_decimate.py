@@ -0,0 +1,108 @@
+# Tolerance-driven fit-point decimation for the sketch splines.
+# Douglas-Peucker on each surface run keeps points where the surface bends
+# and drops them along the flat mid-chord. Points inside the leading- and
+# trailing-edge windows are always kept so the nose radius and the edge
+# closure keep their original density.
+
+from collections import namedtuple
+
+from .profile_array import HAS_NUMPY, ProfileArray, np
+
+LE_WINDOW = 0.05
+TE_WINDOW = 0.02
+
+DecimationResult = namedtuple("DecimationResult", ["points", "max_error", "removed"])
+
+
+def _segment_distance(px, py, ax, ay, bx, by):
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq <= 0:
+        return ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+    t = ((px - ax) * dx + (py - ay) * dy) / length_sq
+    t = min(1.0, max(0.0, t))
+    return ((px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2) ** 0.5
+
+
+def _span_deviation(xs, ys, start, end):
+    ax, ay, bx, by = xs[start], ys[start], xs[end], ys[end]
+    if HAS_NUMPY:
+        px = xs[start + 1:end]
+        py = ys[start + 1:end]
+        dx = bx - ax
+        dy = by - ay
+        length_sq = dx * dx + dy * dy
+        if length_sq > 0:
+            t = np.clip(((px - ax) * dx + (py - ay) * dy) / length_sq, 0.0, 1.0)
+        else:
+            t = np.zeros(len(px))
+        dist = np.hypot(px - ax - t * dx, py - ay - t * dy)
+        offset = int(dist.argmax())
+        return start + 1 + offset, float(dist[offset])
+
+    best_idx = start + 1
+    best_dist = -1.0
+    for idx in range(start + 1, end):
+        dist = _segment_distance(xs[idx], ys[idx], ax, ay, bx, by)
+        if dist > best_dist:
+            best_idx = idx
+            best_dist = dist
+    return best_idx, best_dist
+
+
+def decimate_surface(points, max_deviation, keep_below_x=None, keep_above_x=None):
+    points = ProfileArray.from_points(points)
+    count = len(points)
+    if max_deviation <= 0 or count < 3:
+        return DecimationResult(points, 0.0, 0)
+
+    xs = points.xs
+    ys = points.ys
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    if keep_below_x is not None or keep_above_x is not None:
+        for idx, x_val in enumerate(xs.tolist() if HAS_NUMPY else xs):
+            if (keep_below_x is not None and x_val <= keep_below_x) or (
+                keep_above_x is not None and x_val >= keep_above_x
+            ):
+                keep[idx] = True
+
+    anchors = [idx for idx, flag in enumerate(keep) if flag]
+    stack = [(a, b) for a, b in zip(anchors, anchors[1:]) if b - a > 1]
+    max_error = 0.0
+    while stack:
+        start, end = stack.pop()
+        idx, dist = _span_deviation(xs, ys, start, end)
+        if dist > max_deviation:
+            keep[idx] = True
+            if idx - start > 1:
+                stack.append((start, idx))
+            if end - idx > 1:
+                stack.append((idx, end))
+        elif dist > max_error:
+            max_error = dist
+
+    kept = [idx for idx, flag in enumerate(keep) if flag]
+    if len(kept) == count:
+        return DecimationResult(points, 0.0, 0)
+    if HAS_NUMPY:
+        decimated = ProfileArray(xs[kept], ys[kept])
+    else:
+        decimated = ProfileArray([xs[idx] for idx in kept], [ys[idx] for idx in kept])
+    return DecimationResult(decimated, max_error, count - len(kept))
+
+
+def decimate_profile_surfaces(lower_pts, upper_pts, max_deviation,
+                              le_window=LE_WINDOW, te_window=TE_WINDOW):
+    lower_pts = ProfileArray.from_points(lower_pts)
+    upper_pts = ProfileArray.from_points(upper_pts)
+    x_min = min(lower_pts.bounds()[0], upper_pts.bounds()[0])
+    x_max = max(lower_pts.bounds()[1], upper_pts.bounds()[1])
+    chord = x_max - x_min
+    keep_below_x = x_min + chord * le_window
+    keep_above_x = x_max - chord * te_window
+
+    lower = decimate_surface(lower_pts, max_deviation, keep_below_x, keep_above_x)
+    upper = decimate_surface(upper_pts, max_deviation, keep_below_x, keep_above_x)
+    return lower, upper
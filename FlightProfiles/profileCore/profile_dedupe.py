@@ -0,0 +1,62 @@
+# Removal of near-duplicate points anywhere on the contour.
+# Points closer than a fraction of the chord to a point already kept, such as
+# the doubled leading-edge row of NACA tables or rows a digitizer repeated,
+# give zero-length spline segments and slow fits. Every kept point goes into
+# a spatial hash with cells as wide as the distance, so each point is only
+# compared with the kept points of its own and the eight surrounding cells
+# and the whole contour is checked in O(n). The first and last point, which
+# close the contour, and the leading and trailing edge are always kept.
+
+from collections import namedtuple
+
+from .profile_array import ProfileArray
+
+DEDUPE_TOLERANCE = 1e-5
+
+DedupeResult = namedtuple("DedupeResult", ["points", "removed", "distance"])
+
+
+# removed: indices of the dropped points in the given points; distance: the
+# model distance below which two points counted as duplicates.
+def remove_near_duplicates(points, tolerance=DEDUPE_TOLERANCE):
+    points = ProfileArray.from_points(points)
+    count = len(points)
+    tolerances = points.tolerances() if count > 2 else None
+    if not tolerances or tolerance <= 0:
+        return DedupeResult(points, (), 0.0)
+    distance = tolerances[2] * tolerance
+    limit = distance * distance
+
+    xs = [float(x_val) for x_val in points.xs]
+    ys = [float(y_val) for y_val in points.ys]
+    keys = [(int(x_val // distance), int(y_val // distance)) for x_val, y_val in zip(xs, ys)]
+    cells = {}
+
+    def near(index):
+        x_val, y_val = xs[index], ys[index]
+        col, row = keys[index]
+        for cell_col in (col - 1, col, col + 1):
+            for cell_row in (row - 1, row, row + 1):
+                for other in cells.get((cell_col, cell_row), ()):
+                    if (xs[other] - x_val) ** 2 + (ys[other] - y_val) ** 2 < limit:
+                        return True
+        return False
+
+    protected = {0, count - 1, int(points.argmin_x()), int(points.argmax_x())}
+    for index in protected:
+        cells.setdefault(keys[index], []).append(index)
+
+    removed = []
+    for index in range(count):
+        if index in protected:
+            continue
+        if near(index):
+            removed.append(index)
+        else:
+            cells.setdefault(keys[index], []).append(index)
+
+    if not removed:
+        return DedupeResult(points, (), distance)
+    dropped = set(removed)
+    kept = [index for index in range(count) if index not in dropped]
+    return DedupeResult(points.take(kept), tuple(removed), distance)
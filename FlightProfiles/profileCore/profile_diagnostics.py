@@ -0,0 +1,219 @@
+# Single-pass profile validation with structured diagnostics.
+# Every check is evaluated in one walk over the points and reported with the
+# offending point indices. Diagnostics are kept in the order of the checks,
+# so the first error matches what the step-by-step validator reported.
+
+from collections import namedtuple
+
+from .profile_array import HAS_NUMPY, ProfileArray
+
+ERROR = "error"
+WARNING = "warning"
+
+Diagnostic = namedtuple("Diagnostic", ["severity", "code", "message", "indices"])
+
+
+class ProfileDiagnostics:
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = []
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, severity, code, message, indices=()):
+        self.items.append(Diagnostic(severity, code, message, tuple(indices)))
+
+    def error(self, code, message, indices=()):
+        self.add(ERROR, code, message, indices)
+
+    @property
+    def errors(self):
+        return [item for item in self.items if item.severity == ERROR]
+
+    @property
+    def ok(self):
+        return not any(item.severity == ERROR for item in self.items)
+
+    def first_error(self):
+        for item in self.items:
+            if item.severity == ERROR:
+                return item.message
+        return None
+
+    def to_dicts(self):
+        return [item._asdict() for item in self.items]
+
+
+# ordered: the surfaces are given by the position in the loop (Selig and
+# Lednicer files), so a cambered lower surface may rise above y = 0 and the
+# checks that tell the surfaces apart by the sign of y are skipped.
+def diagnose_profile_sequence(points, ordered=False):
+    points = ProfileArray.from_points(points)
+    diagnostics = ProfileDiagnostics()
+    count = len(points)
+    if count < 3:
+        diagnostics.error("too_few_points", "Not enough points to validate profile order.")
+        return diagnostics
+
+    tolerances = points.tolerances()
+    if not tolerances:
+        diagnostics.error("zero_chord", "Invalid profile data: chord length is zero.")
+        return diagnostics
+    x_min, x_max, chord, x_tol, y_tol = tolerances
+
+    xs = points.xs.tolist() if HAS_NUMPY else points.xs
+    ys = points.ys.tolist() if HAS_NUMPY else points.ys
+
+    te_run = 0
+    x_max_upper = None
+    x_max_lower = None
+    signs = []
+    sign_starts = []
+    le_indices = []
+    le_on_axis = False
+    upper_order = []
+    lower_order = []
+    upper_negative = []
+    lower_positive = []
+    prev_x = None
+
+    for idx, (x_val, y_val) in enumerate(zip(xs, ys)):
+        if abs(x_val - x_max) <= x_tol and abs(y_val) <= y_tol:
+            te_run += 1
+        else:
+            te_run = 0
+
+        if y_val >= -y_tol and (x_max_upper is None or x_val > x_max_upper):
+            x_max_upper = x_val
+        if y_val <= y_tol and (x_max_lower is None or x_val > x_max_lower):
+            x_max_lower = x_val
+
+        if y_val > y_tol:
+            sign = 1
+        elif y_val < -y_tol:
+            sign = -1
+        else:
+            sign = 0
+        if sign and (not signs or sign != signs[-1]):
+            signs.append(sign)
+            sign_starts.append(idx)
+
+        is_le = abs(x_val - x_min) <= x_tol
+        if is_le:
+            le_indices.append(idx)
+            lower_order = []
+            lower_positive = []
+            if abs(y_val) <= y_tol:
+                le_on_axis = True
+
+        on_upper = len(le_indices) == 0 or (is_le and len(le_indices) == 1)
+        if on_upper:
+            if prev_x is not None and x_val > prev_x + x_tol:
+                upper_order.append(idx)
+            if sign < 0:
+                upper_negative.append(idx)
+        if le_indices:
+            if not is_le and x_val < prev_x - x_tol:
+                lower_order.append(idx)
+            if sign > 0:
+                lower_positive.append(idx)
+        prev_x = x_val
+
+    if te_run > 1:
+        diagnostics.error(
+            "trailing_edge_duplicates",
+            "CSV ends with repeated trailing-edge points (x near max, y near 0). "
+            "Remove duplicate rows to avoid zero-length errors.",
+            range(count - te_run, count),
+        )
+
+    te_tol = max(x_tol, chord * 0.02)
+    if x_max_upper is None:
+        x_max_upper = x_max
+    if x_max_lower is None:
+        x_max_lower = x_max
+
+    first_x, first_y = xs[0], ys[0]
+    if abs(first_x - x_max_upper) > te_tol:
+        diagnostics.error(
+            "start_not_trailing_edge", "Profile must start at the trailing edge (x near max).", (0,)
+        )
+    if first_y < -y_tol:
+        diagnostics.error(
+            "start_not_upper", "Profile must start on the upper surface (y >= 0).", (0,)
+        )
+
+    last_idx = count - 1
+    last_x, last_y = xs[last_idx], ys[last_idx]
+    if abs(last_x - x_max_lower) > te_tol:
+        diagnostics.error(
+            "end_not_trailing_edge", "Profile must end at the trailing edge (x near max).", (last_idx,)
+        )
+    if last_y > y_tol:
+        diagnostics.error(
+            "end_not_lower", "Profile must end on the lower surface (y <= 0).", (last_idx,)
+        )
+
+    if not signs:
+        diagnostics.error(
+            "on_chord_line",
+            "Profile points lie on the chord line; expected upper and lower surfaces.",
+        )
+    else:
+        if signs[0] != 1:
+            diagnostics.error(
+                "start_not_positive",
+                "Profile must start on the upper surface with positive Y values.",
+                sign_starts[:1],
+            )
+        if not ordered and (len(signs) > 2 or (len(signs) == 2 and signs[1] != -1)):
+            diagnostics.error(
+                "alternating_surfaces",
+                "Profile points alternate between upper and lower surfaces. "
+                "Expected all upper points first, then all lower points.",
+                sign_starts[2:] if signs[0] == 1 else sign_starts[1:],
+            )
+
+    if not le_indices:
+        diagnostics.error("leading_edge_missing", "Leading edge (min X) not found in profile.")
+        return diagnostics
+    if not le_on_axis:
+        diagnostics.error(
+            "leading_edge_off_axis", "Leading edge (min X) should be near y = 0.", le_indices
+        )
+
+    if upper_order:
+        diagnostics.error(
+            "upper_x_order",
+            "Upper surface must move toward the leading edge (x decreasing).",
+            upper_order,
+        )
+    if lower_order:
+        diagnostics.error(
+            "lower_x_order",
+            "Lower surface must move toward the trailing edge (x increasing).",
+            lower_order,
+        )
+    if ordered:
+        return diagnostics
+    if upper_negative:
+        diagnostics.error(
+            "upper_negative_y",
+            "Upper surface contains negative Y values. "
+            "Expected positive Y values up to the leading edge.",
+            upper_negative,
+        )
+    if lower_positive:
+        diagnostics.error(
+            "lower_positive_y",
+            "Lower surface contains positive Y values. "
+            "Expected negative Y values after the leading edge.",
+            lower_positive,
+        )
+
+    return diagnostics
@@ -0,0 +1,37 @@
+# Discovery of profile files in folder trees, shared by the batch validator
+# and the profile library. Sidecar folders are skipped.
+
+import fnmatch
+import os
+
+from .profile_store import SIDECAR_DIR
+
+PROFILE_PATTERNS = ("*.csv", "*.dat")
+
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatch(name.lower(), pattern.lower()) for pattern in patterns)
+
+
+# Yields every folder below path with its profile files. max_depth 0 lists
+# only path itself, None walks the whole tree.
+def walk_profile_folders(path, patterns=PROFILE_PATTERNS, max_depth=None):
+    for root, dirs, files in os.walk(path):
+        depth = 0 if root == path else os.path.relpath(root, path).count(os.sep) + 1
+        if max_depth is not None and depth >= max_depth:
+            dirs[:] = []
+        else:
+            dirs[:] = sorted(name for name in dirs if name != SIDECAR_DIR)
+        found = [name for name in sorted(files) if _matches(name, patterns)]
+        yield root, [os.path.join(root, name) for name in found]
+
+
+def find_profile_files(paths, patterns=PROFILE_PATTERNS, max_depth=None):
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for _, files in walk_profile_folders(path, patterns, max_depth):
+            found.extend(files)
+    return found
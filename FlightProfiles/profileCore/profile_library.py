@@ -0,0 +1,352 @@
+# Indexed profile library.
+# Keeps name, point count, chord, thickness, camber, content hash and
+# validation status for every profile file in a set of folders. The index is
+# stored as JSON and re-scans only parse files whose mtime or size changed;
+# a touched but unchanged file is recognised by its hash.
+# Library folders are indexed with their subfolders. Folders a single profile
+# was browsed from are indexed without them, and only the last
+# BROWSED_FOLDERS are kept. The mtime of every scanned folder is stored, so
+# needs_scan() can tell whether files were added or removed without a walk.
+#
+# Usage (from the repository root):
+#   python -m FlightProfiles.profileCore.profile_library Profiles --index lib.json --search naca
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+from .profile_array import ProfileArray
+from .profile_files import PROFILE_PATTERNS, walk_profile_folders
+from .profile_cache import content_hash
+from .profile_pipeline import normalize_profile
+from .profile_reader import ORDERED_LAYOUTS, parse_profile_data, stream_profile_file
+from .profile_resample import interpolate, interpolation_weights, station_grid
+from .profile_split import split_at_leading_edge
+
+INDEX_VERSION = 2
+BROWSED_FOLDERS = 20
+MEASURE_STATIONS = 101
+# Files of at least STREAM_BYTES are parsed in blocks and thinned to
+# STREAM_MAX_POINTS, as the import does with large scans.
+STREAM_BYTES = 4 * 2 ** 20
+STREAM_MAX_POINTS = 20000
+
+LibraryEntry = namedtuple(
+    "LibraryEntry",
+    [
+        "path",
+        "name",
+        "mtime_ns",
+        "size",
+        "content_hash",
+        "status",
+        "error",
+        "points",
+        "chord",
+        "thickness",
+        "thickness_pos",
+        "camber",
+        "camber_pos",
+    ],
+)
+ProfileShape = namedtuple(
+    "ProfileShape", ["chord", "thickness", "thickness_pos", "camber", "camber_pos"]
+)
+ScanResult = namedtuple("ScanResult", ["added", "updated", "removed", "unchanged", "seconds"])
+
+
+# Thickness and camber are given as fractions of the chord, measured on a
+# cosine grid; positions are chord fractions from the leading edge. points
+# must be a validated contour.
+def measure_profile(points, stations=MEASURE_STATIONS):
+    points = ProfileArray.from_points(points)
+    tolerances = points.tolerances() if len(points) else None
+    if not tolerances:
+        raise ValueError("Invalid profile data: chord length is zero.")
+    x_min, _, chord, _, _ = tolerances
+
+    # Only measure where both surfaces have points, so a surface that ends
+    # short of the chord does not show up as camber near the trailing edge.
+    lower, upper = split_at_leading_edge(points)
+    start = max(float(lower.xs[0]), float(upper.xs[0]))
+    length = min(float(lower.xs[-1]), float(upper.xs[-1])) - start
+    targets = [start + station * length for station in station_grid(stations)]
+    grid = [(x_val - x_min) / chord for x_val in targets]
+    upper_ys = interpolate(upper.ys, interpolation_weights(upper.xs, targets))
+    lower_ys = interpolate(lower.ys, interpolation_weights(lower.xs, targets))
+
+    thickness = 0.0
+    thickness_pos = 0.0
+    camber = 0.0
+    camber_pos = 0.0
+    for station, upper_y, lower_y in zip(grid, upper_ys, lower_ys):
+        local_thickness = (upper_y - lower_y) / chord
+        local_camber = 0.5 * (upper_y + lower_y) / chord
+        if local_thickness > thickness:
+            thickness = local_thickness
+            thickness_pos = station
+        if abs(local_camber) > abs(camber):
+            camber = local_camber
+            camber_pos = station
+    return ProfileShape(chord, float(thickness), thickness_pos, float(camber), camber_pos)
+
+
+def _index_key(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def _folder_mtime(folder):
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return None
+
+
+# stream_bytes None reads every file at once.
+def analyze_profile_file(
+    file_path, stat=None, known=None, stream_bytes=STREAM_BYTES, max_points=STREAM_MAX_POINTS
+):
+    stat = stat or os.stat(file_path)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    entry = LibraryEntry(
+        file_path, name, stat.st_mtime_ns, stat.st_size, None,
+        "failed", None, 0, 0.0, 0.0, 0.0, 0.0, 0.0,
+    )
+    # A file that does not decode is kept as a failed entry, so it is not
+    # read again until it changes and does not stop the scan.
+    try:
+        streamed = None
+        if stream_bytes is not None and stat.st_size >= stream_bytes:
+            streamed = stream_profile_file(file_path, max_points)
+        if streamed is not None:
+            digest = streamed.content_hash
+        else:
+            with open(file_path, "rb") as handle:
+                data = handle.read()
+            digest = content_hash(data)
+        if known is not None and known.content_hash == digest:
+            return known._replace(path=file_path, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+        entry = entry._replace(content_hash=digest)
+        if streamed is not None:
+            points, profile_format = streamed.points, streamed.profile_format
+        else:
+            points, profile_format = parse_profile_data(data, file_path)
+        points, diagnostics, corrections = normalize_profile(
+            points, profile_format.layout in ORDERED_LAYOUTS
+        )
+    except ValueError as exc:
+        return entry._replace(error=f"Unable to read profile file: {exc}")
+    if not diagnostics.ok:
+        return entry._replace(points=len(points or ()), error=diagnostics.first_error())
+
+    try:
+        shape = measure_profile(points)
+    except ValueError as exc:
+        return entry._replace(points=len(points), error=str(exc))
+    return entry._replace(
+        status="corrected" if corrections else "valid",
+        points=len(points),
+        **shape._asdict(),
+    )
+
+
+class ProfileLibrary:
+    def __init__(self, index_path=None, stream_bytes=STREAM_BYTES, max_points=STREAM_MAX_POINTS):
+        self.index_path = index_path
+        self.stream_bytes = stream_bytes
+        self.max_points = max_points
+        self.folders = []
+        self.browsed = []
+        self.folder_mtimes = {}
+        self._entries = {}
+        self._names = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def get(self, file_path):
+        return self._entries.get(_index_key(file_path))
+
+    def _set(self, key, entry):
+        self._entries[key] = entry
+        self._names[key] = entry.name.lower()
+
+    @classmethod
+    def load(cls, index_path, stream_bytes=STREAM_BYTES, max_points=STREAM_MAX_POINTS):
+        library = cls(index_path, stream_bytes, max_points)
+        try:
+            with open(index_path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return library
+        if data.get("version") != INDEX_VERSION:
+            return library
+
+        library.folders = list(data.get("folders", []))
+        library.browsed = list(data.get("browsed", []))
+        library.folder_mtimes = dict(data.get("folder_mtimes", {}))
+        for item in data.get("entries", []):
+            try:
+                entry = LibraryEntry(**item)
+            except TypeError:
+                continue
+            library._set(_index_key(entry.path), entry)
+        return library
+
+    def save(self, index_path=None):
+        index_path = index_path or self.index_path
+        data = {
+            "version": INDEX_VERSION,
+            "folders": self.folders,
+            "browsed": self.browsed,
+            "folder_mtimes": self.folder_mtimes,
+            "entries": [entry._asdict() for entry in self._entries.values()],
+        }
+        directory = os.path.dirname(os.path.abspath(index_path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+        os.replace(tmp_path, index_path)
+
+    def add_folder(self, folder):
+        folder = os.path.abspath(folder)
+        if any(_index_key(known) == _index_key(folder) for known in self.folders):
+            return False
+        self.folders.append(folder)
+        return True
+
+    # Returns False when the folder is already indexed, on its own or inside
+    # a library folder.
+    def add_browsed(self, folder):
+        folder = os.path.abspath(folder)
+        key = _index_key(folder)
+        if any(_index_key(known) == key for known in self.browsed):
+            return False
+        for known in self.folders:
+            known_key = _index_key(known)
+            if key == known_key or key.startswith(known_key.rstrip(os.sep) + os.sep):
+                return False
+        self.browsed.append(folder)
+        del self.browsed[:-BROWSED_FOLDERS]
+        return True
+
+    def needs_scan(self, folders=()):
+        known = {_index_key(folder) for folder in self.folders}
+        if any(_index_key(folder) not in known for folder in folders):
+            return True
+        if not self.folder_mtimes:
+            return bool(self.folders or self.browsed)
+        return any(
+            _folder_mtime(folder) != mtime_ns for folder, mtime_ns in self.folder_mtimes.items()
+        )
+
+    def scan(self, folders=None, patterns=PROFILE_PATTERNS):
+        start = time.perf_counter()
+        for folder in folders or ():
+            self.add_folder(folder)
+
+        added = updated = unchanged = 0
+        seen = set()
+        mtimes = {}
+        roots = [(folder, None) for folder in self.folders]
+        roots.extend((folder, 0) for folder in self.browsed)
+        found = []
+        for folder, max_depth in roots:
+            mtimes[folder] = _folder_mtime(folder)
+            if mtimes[folder] is None:
+                continue
+            for root, files in walk_profile_folders(folder, patterns, max_depth):
+                mtimes[root] = _folder_mtime(root)
+                found.extend(files)
+
+        for file_path in found:
+            key = _index_key(file_path)
+            if key in seen:
+                continue
+            seen.add(key)
+            try:
+                stat = os.stat(file_path)
+                known = self._entries.get(key)
+                if known is not None and (known.mtime_ns, known.size) == (
+                    stat.st_mtime_ns, stat.st_size
+                ):
+                    unchanged += 1
+                    continue
+                entry = analyze_profile_file(
+                    file_path, stat, known, self.stream_bytes, self.max_points
+                )
+            except OSError:
+                continue
+            self._set(key, entry)
+            if known is None:
+                added += 1
+            else:
+                updated += 1
+        self.folder_mtimes = mtimes
+
+        removed = [key for key in self._entries if key not in seen]
+        for key in removed:
+            del self._entries[key]
+            del self._names[key]
+        return ScanResult(added, updated, len(removed), unchanged, time.perf_counter() - start)
+
+    def search(self, query="", limit=50, valid_only=False, min_thickness=None, max_thickness=None):
+        terms = query.lower().split()
+        matches = []
+        for key, name in self._names.items():
+            if not all(term in name for term in terms):
+                continue
+            entry = self._entries[key]
+            if valid_only and entry.status == "failed":
+                continue
+            if min_thickness is not None and entry.thickness < min_thickness:
+                continue
+            if max_thickness is not None and entry.thickness > max_thickness:
+                continue
+            prefix = bool(terms) and name.startswith(terms[0])
+            matches.append((not prefix, name, entry))
+        matches.sort(key=lambda match: match[:2])
+        return [entry for _, _, entry in matches[:limit]]
+
+
+def format_library_entry(entry):
+    if entry.status == "failed":
+        return f"{entry.name} (invalid)"
+    return (
+        f"{entry.name}  t {entry.thickness * 100:.1f}% @ {entry.thickness_pos * 100:.0f}%"
+        f"  f {entry.camber * 100:.1f}% @ {entry.camber_pos * 100:.0f}%"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index and search airfoil profile folders.")
+    parser.add_argument("folders", nargs="*", help="Folders to add to the library.")
+    parser.add_argument("--index", required=True, help="Library index JSON file.")
+    parser.add_argument("--search", help="Only list profiles whose name contains these words.")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    library = ProfileLibrary.load(args.index)
+    result = library.scan(args.folders)
+    library.save()
+    print(
+        f"{len(library)} profiles: {result.added} added, {result.updated} updated, "
+        f"{result.removed} removed, {result.unchanged} unchanged ({result.seconds:.3f} s)",
+        file=sys.stderr,
+    )
+    if args.search is not None:
+        for entry in library.search(args.search, args.limit):
+            print(format_library_entry(entry))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+# Ordering of unordered point clouds, such as 3D scan exports, whose upper
+# and lower points share no x stations.
+# The points go into a uniform grid sized so that each occupied cell holds
+# about two points. Starting at the trailing edge, the chain repeatedly steps
+# to the nearest unvisited point, searching the grid ring by ring around the
+# current point, so the whole contour is ordered in roughly O(n). Each step
+# is weighted by how far it turns away from the previous one, which keeps the
+# chain on its surface instead of zigzagging between upper and lower points.
+# The loop is then cut into the two surfaces at the leading edge and the
+# trailing edge, and each surface is put in x order as the validator expects.
+
+import math
+
+from .profile_array import ProfileArray
+
+X_GROUPS = "x_groups"
+NEAREST = "nearest"
+ORDERINGS = (X_GROUPS, NEAREST)
+
+# A step straight back costs 1 + TURN_WEIGHT times its length.
+TURN_WEIGHT = 2.0
+POINTS_PER_CELL = 2.0
+# Chord fractions: trailing-edge window the surfaces may be reassigned in,
+# and its smallest width.
+TE_WINDOW = 0.25
+TE_MIN_WINDOW = 0.02
+
+
+class _PointGrid:
+    def __init__(self, xs, ys):
+        x_min, x_max = min(xs), max(xs)
+        y_min, y_max = min(ys), max(ys)
+        # A closed contour is about twice as long as its bounding box is wide
+        # and high, and its points are spread along that length.
+        length = 2.0 * ((x_max - x_min) + (y_max - y_min))
+        self.cell = max(length * POINTS_PER_CELL / len(xs), 1e-12)
+        self.x_min = x_min
+        self.y_min = y_min
+        self.xs = xs
+        self.ys = ys
+        self.cells = {}
+        for index in range(len(xs)):
+            self.cells.setdefault(self._key(xs[index], ys[index]), []).append(index)
+        self.max_ring = int(max(x_max - x_min, y_max - y_min) / self.cell) + 2
+
+    def _key(self, x_val, y_val):
+        return (int((x_val - self.x_min) / self.cell), int((y_val - self.y_min) / self.cell))
+
+    def remove(self, index):
+        key = self._key(self.xs[index], self.ys[index])
+        members = self.cells[key]
+        members.remove(index)
+        if not members:
+            del self.cells[key]
+
+    def _ring(self, center, ring):
+        col, row = center
+        if ring == 0:
+            yield center
+            return
+        for offset in range(-ring, ring + 1):
+            yield (col + offset, row - ring)
+            yield (col + offset, row + ring)
+        for offset in range(-ring + 1, ring):
+            yield (col - ring, row + offset)
+            yield (col + ring, row + offset)
+
+    # Cheapest unvisited point from index; direction is the unit vector of
+    # the previous step or None. Rings are searched until no point in the
+    # next ring can be closer than the cheapest one found. Far from every
+    # remaining point, scanning the occupied cells is cheaper than the rings.
+    def nearest(self, index, direction):
+        x_val, y_val = self.xs[index], self.ys[index]
+        center = self._key(x_val, y_val)
+        best = None
+        best_cost = math.inf
+        for ring in range(self.max_ring + 1):
+            if (ring - 1) * self.cell >= best_cost:
+                break
+            scan_all = (2 * ring + 1) ** 2 > len(self.cells)
+            keys = list(self.cells) if scan_all else self._ring(center, ring)
+            for key in keys:
+                for other in self.cells.get(key, ()):
+                    dx = self.xs[other] - x_val
+                    dy = self.ys[other] - y_val
+                    dist = math.hypot(dx, dy)
+                    cost = dist
+                    if direction is not None and dist > 0:
+                        turn = 1.0 - (dx * direction[0] + dy * direction[1]) / dist
+                        cost = dist * (1.0 + TURN_WEIGHT * 0.5 * turn)
+                    if cost < best_cost:
+                        best_cost = cost
+                        best = other
+            if scan_all:
+                break
+        return best
+
+
+def _signed_area(xs, ys, order):
+    total = 0.0
+    for position, index in enumerate(order):
+        other = order[(position + 1) % len(order)]
+        total += xs[index] * ys[other] - xs[other] * ys[index]
+    return total / 2.0
+
+
+# x where the run, once past x_limit, stops moving away from the leading edge
+# or zigzags up and down, or None.
+def _break_x(xs, ys, run, x_limit):
+    for position in range(1, len(run)):
+        previous = run[position - 1]
+        if xs[previous] < x_limit:
+            continue
+        if xs[run[position]] <= xs[previous]:
+            return xs[previous]
+        if 2 <= position < len(run) - 1:
+            steps = [
+                ys[run[offset]] - ys[run[offset - 1]]
+                for offset in range(position - 1, position + 2)
+            ]
+            if steps[0] * steps[1] < 0 and steps[1] * steps[2] < 0:
+                return xs[previous]
+    return None
+
+
+# First position after the leading edge at or beyond x_start.
+def _window_position(xs, run, x_start):
+    position = 1
+    while position < len(run) and xs[run[position]] < x_start:
+        position += 1
+    return position
+
+
+# y of the line through the last two points of the side, at x_val.
+def _extend(xs, ys, side, x_val):
+    if len(side) < 2:
+        return ys[side[-1]]
+    last, previous = side[-1], side[-2]
+    if xs[last] == xs[previous]:
+        return ys[last]
+    slope = (ys[last] - ys[previous]) / (xs[last] - xs[previous])
+    return ys[last] + slope * (x_val - xs[last])
+
+
+# The chained loop, counter-clockwise, cut into the two surfaces at the
+# leading edge. Near a trailing edge thinner than the point spacing the
+# nearest point can lie on the other surface, which shows as a surface run
+# that stops moving away from the leading edge or zigzags. From twice that
+# distance to the trailing edge on, the points are assigned by their side of
+# the line from the camber point ahead of that window to the trailing edge.
+def _assemble(xs, ys, order, y_tol):
+    le_position = min(range(len(order)), key=lambda position: xs[order[position]])
+    loop = order[le_position:] + order[:le_position]
+    lower = loop
+    upper = loop[:1] + loop[:0:-1]
+
+    x_min = xs[loop[0]]
+    x_max = max(xs)
+    chord = x_max - x_min
+    x_limit = x_max - chord * TE_WINDOW
+    breaks = [
+        value
+        for value in (_break_x(xs, ys, lower, x_limit), _break_x(xs, ys, upper, x_limit))
+        if value is not None
+    ]
+    x_break = min(breaks, default=x_max)
+    width = max(x_max - x_break, chord * TE_MIN_WINDOW)
+    x_start = max(x_break - width, x_limit)
+
+    lower_end = _window_position(xs, lower, x_start)
+    upper_end = min(_window_position(xs, upper, x_start), len(loop) - lower_end + 1)
+    lower_last = lower[lower_end - 1]
+    upper_last = upper[upper_end - 1]
+    camber_x = (xs[lower_last] + xs[upper_last]) / 2.0
+    camber_y = (ys[lower_last] + ys[upper_last]) / 2.0
+    te_index = max(loop, key=lambda index: xs[index])
+    x_te, y_te = xs[te_index], ys[te_index]
+    dx = x_te - camber_x
+    dy = y_te - camber_y
+
+    upper_edge = []
+    lower_edge = []
+    te_copies = []
+    for index in lower[lower_end:len(loop) - upper_end + 1]:
+        if xs[index] == x_te and ys[index] == y_te:
+            te_copies.append(index)
+            continue
+        if dx * (ys[index] - camber_y) - dy * (xs[index] - camber_x) > 0:
+            upper_edge.append(index)
+        else:
+            lower_edge.append(index)
+    upper_side = upper[:upper_end] + upper_edge
+    lower_side = lower[:lower_end] + lower_edge
+    upper_side.sort(key=lambda index: xs[index])
+    lower_side.sort(key=lambda index: xs[index])
+
+    # The trailing-edge point lies on the line itself; it joins the surface
+    # it continues best. A closed contour that lists it twice gets it at both
+    # ends, and so does a sharp one on the chord line that lists it once.
+    upper_gap = abs(_extend(xs, ys, upper_side, x_te) - y_te)
+    if len(te_copies) == 1 and abs(y_te) <= y_tol:
+        te_copies = te_copies * 2
+    if len(te_copies) > 1 or upper_gap <= abs(_extend(xs, ys, lower_side, x_te) - y_te):
+        upper_side.append(te_copies[0])
+        lower_side.extend(te_copies[1:])
+    else:
+        lower_side.extend(te_copies)
+    return upper_side[::-1] + lower_side[1:]
+
+
+def order_point_cloud(points):
+    points = ProfileArray.from_points(points)
+    if len(points) < 3:
+        return points
+    xs = [float(x_val) for x_val in points.xs]
+    ys = [float(y_val) for y_val in points.ys]
+    tolerances = points.tolerances()
+    if not tolerances:
+        return points
+
+    grid = _PointGrid(xs, ys)
+    start = max(range(len(xs)), key=lambda index: (xs[index], ys[index]))
+    order = [start]
+    grid.remove(start)
+    direction = None
+    for _ in range(len(xs) - 1):
+        current = order[-1]
+        following = grid.nearest(current, direction)
+        grid.remove(following)
+        dx = xs[following] - xs[current]
+        dy = ys[following] - ys[current]
+        length = math.hypot(dx, dy)
+        if length > 0:
+            direction = (dx / length, dy / length)
+        order.append(following)
+
+    # Counter-clockwise, the loop runs from the leading edge along the lower
+    # surface first.
+    if _signed_area(xs, ys, order) < 0:
+        order = order[:1] + order[:0:-1]
+    order = _assemble(xs, ys, order, tolerances[4])
+    return ProfileArray([xs[index] for index in order], [ys[index] for index in order])
@@ -0,0 +1,67 @@
+# Compact storage for large sets of profiles.
+# All points of all profiles are kept in one interleaved float64 buffer
+# (x0, y0, x1, y1, ...) with a table of start offsets, which is 16 bytes per
+# point plus 8 bytes per profile. Indexing returns a ProfileArray whose x and
+# y buffers are strided views into the pack, so no points are copied.
+
+from array import array
+
+from .profile_array import HAS_NUMPY, ProfileArray, np
+
+
+class ProfilePack:
+    """Immutable set of profiles packed into one interleaved buffer."""
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, profiles=()):
+        profiles = [ProfileArray.from_points(points) for points in profiles]
+        offsets = array("q", [0])
+        for points in profiles:
+            offsets.append(offsets[-1] + len(points))
+        total = offsets[-1]
+
+        if HAS_NUMPY:
+            data = np.empty((total, 2), dtype=np.float64)
+            for points, start, stop in zip(profiles, offsets, offsets[1:]):
+                data[start:stop, 0] = points.xs
+                data[start:stop, 1] = points.ys
+        else:
+            data = array("d", [0.0]) * (2 * total)
+            view = memoryview(data)
+            for points, start, stop in zip(profiles, offsets, offsets[1:]):
+                view[2 * start:2 * stop:2] = array("d", points.xs)
+                view[2 * start + 1:2 * stop:2] = array("d", points.ys)
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Profile index out of range.")
+        start = self._offsets[index]
+        stop = self._offsets[index + 1]
+        if HAS_NUMPY:
+            block = self._data[start:stop]
+            return ProfileArray(block[:, 0], block[:, 1])
+        view = memoryview(self._data)
+        return ProfileArray(view[2 * start:2 * stop:2], view[2 * start + 1:2 * stop:2])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"ProfilePack({len(self)} profiles, {self.point_count} points)"
+
+    @property
+    def point_count(self):
+        return self._offsets[-1]
+
+    @property
+    def nbytes(self):
+        return memoryview(self._data).nbytes + memoryview(self._offsets).nbytes
@@ -0,0 +1,277 @@
+# Normalization and validation of parsed profile points.
+# Expected order: start at the trailing edge upper surface, run to the
+# leading edge and return along the lower surface to the trailing edge.
+
+from .profile_array import ProfileArray
+from .profile_dedupe import remove_near_duplicates
+from .profile_diagnostics import ProfileDiagnostics, diagnose_profile_sequence
+from .profile_order import NEAREST, ORDERINGS, X_GROUPS, order_point_cloud
+from .profile_trace import trace_span
+
+
+def trailing_edge_duplicate_count(points, x_max, x_tol, y_tol):
+    count = 0
+    for x_val, y_val in reversed(points):
+        if abs(x_val - x_max) <= x_tol and abs(y_val) <= y_tol:
+            count += 1
+        else:
+            break
+    return count
+
+
+def is_interleaved_profile(points, y_tol):
+    signs = []
+    for _, y_val in points:
+        if y_val > y_tol:
+            sign = 1
+        elif y_val < -y_tol:
+            sign = -1
+        else:
+            continue
+        if not signs or sign != signs[-1]:
+            signs.append(sign)
+    return len(signs) > 2
+
+
+# xs must already be sorted ascending.
+def _median_dx(xs):
+    if len(xs) < 3:
+        return 0.0
+    dxs = [float(xs[idx + 1] - xs[idx]) for idx in range(len(xs) - 1)]
+    dxs = [dx for dx in dxs if dx > 0]
+    if not dxs:
+        return 0.0
+    dxs.sort()
+    return dxs[len(dxs) // 2]
+
+
+def _collapse_trailing_edge(points, x_max, window, pair_tol, keep_upper):
+    if window <= 0 or pair_tol <= 0 or len(points) < 3:
+        return points
+    threshold = x_max - window
+    collapsed = []
+    for x_val, y_val in points:
+        if x_val < threshold:
+            collapsed.append((x_val, y_val))
+            continue
+        if collapsed and abs(x_val - collapsed[-1][0]) <= pair_tol:
+            if keep_upper:
+                if y_val > collapsed[-1][1]:
+                    collapsed[-1] = (x_val, y_val)
+            else:
+                if y_val < collapsed[-1][1]:
+                    collapsed[-1] = (x_val, y_val)
+        else:
+            collapsed.append((x_val, y_val))
+    return collapsed
+
+
+def cleanup_trailing_edge(points, x_tol, y_tol):
+    points = ProfileArray.from_points(points)
+    if len(points) < 6:
+        return points, False
+
+    index = points.sorted_profile()
+    min_idx = index.le_index
+    if min_idx == 0 or min_idx == len(points) - 1:
+        return points, False
+
+    upper = points[:min_idx + 1]
+    lower = points[min_idx:].sorted_profile().sorted_points()
+
+    x_max = index.x_max
+    chord = x_max - index.x_min
+    if chord <= 0:
+        return points, False
+
+    edge_window = chord * 0.02
+    ys = [y_val for x_val, y_val in lower if x_val >= x_max - edge_window]
+    if len(ys) < 4:
+        return points, False
+
+    signs = []
+    for idx in range(1, len(ys)):
+        dy = ys[idx] - ys[idx - 1]
+        if abs(dy) <= y_tol:
+            continue
+        sign = 1 if dy > 0 else -1
+        if not signs or sign != signs[-1]:
+            signs.append(sign)
+
+    if len(signs) < 2:
+        return points, False
+
+    median_dx = _median_dx(lower.xs)
+    pair_tol = max(x_tol, median_dx * 0.5) if median_dx > 0 else x_tol
+    lower_clean = _collapse_trailing_edge(
+        list(lower), x_max, edge_window, pair_tol, keep_upper=False
+    )
+
+    if lower_clean and upper and lower_clean[0] == upper[-1]:
+        lower_clean = lower_clean[1:]
+
+    return upper + lower_clean, True
+
+
+def sort_interleaved_profile(points, x_tol, y_tol):
+    if not points:
+        return None
+
+    index = ProfileArray.from_points(points).sorted_profile()
+    x_max = index.x_max
+    chord = x_max - index.x_min
+    if chord <= 0:
+        return None
+
+    sorted_points = list(index.sorted_points())
+    groups = []
+    current = [sorted_points[0]]
+
+    for point in sorted_points[1:]:
+        if abs(point[0] - current[-1][0]) <= x_tol:
+            current.append(point)
+        else:
+            groups.append(current)
+            current = [point]
+
+    groups.append(current)
+
+    upper_pts = []
+    lower_pts = []
+    for group in groups:
+        x_val = sum(point[0] for point in group) / len(group)
+        ys = [point[1] for point in group]
+        max_y = max(ys)
+        min_y = min(ys)
+        has_pos = max_y > y_tol
+        has_neg = min_y < -y_tol
+
+        if has_pos and has_neg:
+            upper_pts.append((x_val, max_y))
+            lower_pts.append((x_val, min_y))
+        elif has_pos:
+            upper_pts.append((x_val, max_y))
+        elif has_neg:
+            lower_pts.append((x_val, min_y))
+        else:
+            upper_pts.append((x_val, max_y))
+            lower_pts.append((x_val, min_y))
+
+    # The groups come out in increasing x, so both runs are already sorted.
+    upper_sorted = upper_pts[::-1]
+    lower_sorted = lower_pts
+
+    edge_window = chord * 0.02
+    upper_dx = _median_dx([point[0] for point in upper_pts])
+    lower_dx = _median_dx([point[0] for point in lower_pts])
+    upper_tol = max(x_tol, upper_dx * 0.5) if upper_dx > 0 else x_tol
+    lower_tol = max(x_tol, lower_dx * 0.5) if lower_dx > 0 else x_tol
+    upper_sorted = _collapse_trailing_edge(
+        upper_sorted, x_max, edge_window, upper_tol, keep_upper=True
+    )
+    lower_sorted = _collapse_trailing_edge(
+        lower_sorted, x_max, edge_window, lower_tol, keep_upper=False
+    )
+
+    if upper_sorted and lower_sorted:
+        upper_le = upper_sorted[-1]
+        lower_le = lower_sorted[0]
+        if (
+            abs(upper_le[0] - lower_le[0]) <= x_tol
+            and abs(upper_le[1] - lower_le[1]) <= y_tol
+        ):
+            lower_sorted = lower_sorted[1:]
+
+    return ProfileArray.from_points(upper_sorted + lower_sorted)
+
+
+def validate_profile_sequence(points):
+    return diagnose_profile_sequence(points).first_error()
+
+
+# ordered: the file layout fixes the point order (Selig, Lednicer), so the
+# interleaved-point sorting and the y-sign surface checks are skipped.
+# ordering: how other files are put in order. X_GROUPS sorts interleaved
+# points that share x stations; NEAREST chains the points through a spatial
+# grid, for scans whose surfaces share no stations. Its result is validated
+# like an ordered file.
+def normalize_profile(points, ordered=False, ordering=X_GROUPS):
+    if ordering not in ORDERINGS:
+        raise ValueError(f"Unknown profile ordering: {ordering}")
+    points = ProfileArray.from_points(points)
+    with trace_span("normalize", points=len(points)) as span:
+        points, diagnostics, corrections = _correct_profile(points, ordered, ordering)
+        span.args["corrections"] = len(corrections)
+    if not diagnostics.ok:
+        return points, diagnostics, corrections
+    ordered = ordered or ordering == NEAREST
+    with trace_span("validate", points=len(points)):
+        return points, diagnose_profile_sequence(points, ordered), corrections
+
+
+# Fixes the known point order problems; diagnostics only carry the errors
+# that stop the corrections.
+def _correct_profile(points, ordered=False, ordering=X_GROUPS):
+    diagnostics = ProfileDiagnostics()
+    if len(points) < 2:
+        diagnostics.error("no_points", "No valid point pairs found in the CSV file.")
+        return points, diagnostics, []
+
+    tolerances = points.tolerances()
+    if not tolerances:
+        diagnostics.error("zero_chord", "Invalid profile data: chord length is zero.")
+        return points, diagnostics, []
+    _, x_max, _, x_tol, y_tol = tolerances
+
+    corrections = []
+    if not ordered and ordering == NEAREST:
+        with trace_span("order", points=len(points)):
+            chained = order_point_cloud(points)
+        if chained != points:
+            points = chained
+            corrections.append("Unordered points were chained by nearest neighbour.")
+        ordered = True
+
+    trailing_te = trailing_edge_duplicate_count(points, x_max, x_tol, y_tol)
+    if trailing_te > 1:
+        points = points[: -(trailing_te - 1)]
+        corrections.append("Removed repeated trailing-edge rows.")
+
+    if not ordered and is_interleaved_profile(points, y_tol):
+        sorted_points = sort_interleaved_profile(points, x_tol, y_tol)
+        if not sorted_points:
+            diagnostics.error("sort_failed", "Unable to sort interleaved profile points.")
+            return points, diagnostics, corrections
+        points = sorted_points
+        corrections.append("Interleaved points were sorted.")
+
+    points, te_fixed = cleanup_trailing_edge(points, x_tol, y_tol)
+    if te_fixed:
+        corrections.append("Collapsed trailing-edge oscillations.")
+
+    deduped = remove_near_duplicates(points)
+    if deduped.removed:
+        corrections.append(_near_duplicate_note(points, deduped))
+        points = deduped.points
+
+    return points, diagnostics, corrections
+
+
+def _near_duplicate_note(points, deduped, shown=3):
+    listed = ", ".join(
+        f"({points[index][0]:.6g}, {points[index][1]:.6g})" for index in deduped.removed[:shown]
+    )
+    if len(deduped.removed) > shown:
+        listed += f" and {len(deduped.removed) - shown} more"
+    noun = "point" if len(deduped.removed) == 1 else "points"
+    return (
+        f"Removed {len(deduped.removed)} near-duplicate {noun} "
+        f"(closer than {deduped.distance:.3g}): {listed}."
+    )
+
+
+def normalize_profile_points(points, ordered=False, ordering=X_GROUPS):
+    points, diagnostics, corrections = normalize_profile(points, ordered, ordering)
+    if not diagnostics.ok:
+        return None, diagnostics.first_error(), corrections
+    return points, None, corrections
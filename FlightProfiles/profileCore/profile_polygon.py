@@ -0,0 +1,73 @@
+# Area, centroid and bounding box of the closed outline drawn for a profile.
+# The add-in picks the loft profile of a sketch by comparing the bounding
+# boxes of its regions with this outline, instead of asking Fusion for the
+# area of every region.
+
+from collections import namedtuple
+
+from .profile_array import HAS_NUMPY, ProfileArray, np
+
+BOX_TOLERANCE = 0.02
+
+OutlineProperties = namedtuple(
+    "OutlineProperties", ["area", "centroid", "x_min", "y_min", "x_max", "y_max"]
+)
+
+
+# Lower and upper surfaces both run from the leading edge to the trailing
+# edge; the outline goes out along the lower one and back along the upper.
+def surfaces_outline(lower, upper):
+    return ProfileArray.from_points(lower) + ProfileArray.from_points(upper)[::-1]
+
+
+# Shoelace formula over the closed polygon; the last point connects back to
+# the first. The area is returned unsigned, whatever the point order.
+def outline_properties(points):
+    points = ProfileArray.from_points(points)
+    if len(points) < 3:
+        raise ValueError("At least three points are required for an outline.")
+    xs = points.xs
+    ys = points.ys
+    if HAS_NUMPY:
+        next_xs = np.roll(xs, -1)
+        next_ys = np.roll(ys, -1)
+        cross = xs * next_ys - next_xs * ys
+        twice_area = float(cross.sum())
+        moment_x = float(((xs + next_xs) * cross).sum())
+        moment_y = float(((ys + next_ys) * cross).sum())
+    else:
+        twice_area = moment_x = moment_y = 0.0
+        count = len(xs)
+        for idx in range(count):
+            x_val, y_val = xs[idx], ys[idx]
+            next_x, next_y = xs[(idx + 1) % count], ys[(idx + 1) % count]
+            cross = x_val * next_y - next_x * y_val
+            twice_area += cross
+            moment_x += (x_val + next_x) * cross
+            moment_y += (y_val + next_y) * cross
+
+    x_min, x_max, y_min, y_max = points.bounds()
+    if twice_area:
+        centroid = (moment_x / (3.0 * twice_area), moment_y / (3.0 * twice_area))
+    else:
+        centroid = (0.5 * (x_min + x_max), 0.5 * (y_min + y_max))
+    return OutlineProperties(abs(twice_area) / 2.0, centroid, x_min, y_min, x_max, y_max)
+
+
+# Indices of the boxes (x_min, y_min, x_max, y_max) whose sides all lie
+# within tolerance times the outline's larger extent of the outline's box.
+# Boxes that are None never match.
+def matching_boxes(boxes, outline, tolerance=BOX_TOLERANCE):
+    limit = tolerance * max(outline.x_max - outline.x_min, outline.y_max - outline.y_min)
+    target = (outline.x_min, outline.y_min, outline.x_max, outline.y_max)
+    known = [idx for idx, box in enumerate(boxes) if box is not None]
+    if not known:
+        return []
+    if HAS_NUMPY:
+        sides = np.asarray([boxes[idx] for idx in known], dtype=np.float64)
+        close = (np.abs(sides - np.asarray(target)) <= limit).all(axis=1)
+        return [known[idx] for idx in np.flatnonzero(close)]
+    return [
+        idx for idx in known
+        if all(abs(side - value) <= limit for side, value in zip(boxes[idx], target))
+    ]
@@ -0,0 +1,390 @@
+# Readers for profile point files.
+# A registry picks the reader by file extension and, where the extension is
+# shared or unknown, by sniffing the first lines. The CSV reader is a single
+# pass: the dialect (delimiter, decimal separator, Z column) is sniffed once
+# from the first data line and returned together with the points, so a
+# profile file is opened exactly once per import.
+
+import hashlib
+import locale
+import math
+import os
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+from .profile_array import ProfileArray
+from .profile_dat import (
+    SNIFF_LINES,
+    lednicer_point_lines,
+    parse_lednicer_text,
+    parse_selig_text,
+    sniff_lednicer,
+    sniff_selig,
+)
+from .profile_trace import trace_span
+
+CSV = "csv"
+SELIG = "selig"
+LEDNICER = "lednicer"
+# Layouts whose point order is fixed by the format; they skip the sorting of
+# interleaved points.
+ORDERED_LAYOUTS = frozenset((SELIG, LEDNICER))
+
+ProfileFormat = namedtuple(
+    "ProfileFormat", ["delimiter", "decimal_sep", "include_z", "layout"], defaults=(CSV,)
+)
+ProfileReader = namedtuple("ProfileReader", ["name", "extensions", "sniff", "parse"])
+StreamResult = namedtuple(
+    "StreamResult",
+    ["points", "profile_format", "rows", "size", "seconds", "rows_per_second", "content_hash"],
+)
+
+DEFAULT_FORMAT = ProfileFormat(",", ".", False)
+DAT_FORMAT = ProfileFormat(" ", ".", False, SELIG)
+
+STREAM_CHUNK_BYTES = 2 ** 20
+# Layouts with one point per line, which can be parsed block by block.
+_STREAMED_LAYOUTS = (CSV, SELIG)
+
+_readers = []
+
+
+def _is_data_line(line):
+    return bool(line) and not line.startswith("#")
+
+
+def sniff_format(line):
+    if ";" in line:
+        delimiter = ";"
+        decimal_sep = ","
+    else:
+        delimiter = ","
+        decimal_sep = "."
+    parts = [part for part in line.split(delimiter) if part.strip()]
+    return ProfileFormat(delimiter, decimal_sep, len(parts) >= 3)
+
+
+def _parse_line(line):
+    # Per-line fallback for rows that do not follow the sniffed dialect.
+    delimiter = ";" if ";" in line else ","
+    if delimiter in line:
+        parts = [part.strip() for part in line.split(delimiter) if part.strip()]
+    else:
+        parts = line.split()
+
+    if len(parts) < 2:
+        return None
+
+    x_str = parts[0]
+    y_str = parts[1]
+    if delimiter == ";":
+        x_str = x_str.replace(",", ".")
+        y_str = y_str.replace(",", ".")
+
+    try:
+        return float(x_str), float(y_str)
+    except ValueError:
+        return None
+
+
+def _line_splitter(profile_format, line):
+    # Returns the precompiled fast path for the sniffed dialect. Each path
+    # returns the raw fields or None when the line needs the generic parser.
+    if profile_format.delimiter == ";":
+        def split(text):
+            if ";" not in text:
+                return None
+            return text.replace(",", ".").split(";")
+    elif "," in line:
+        def split(text):
+            if "," not in text or ";" in text:
+                return None
+            return text.split(",")
+    else:
+        def split(text):
+            if "," in text or ";" in text:
+                return None
+            return text.split()
+    return split
+
+
+def parse_profile_text(text, file_path=None):
+    reader = find_reader(text, file_path)
+    with trace_span("parse", chars=len(text), reader=reader.name) as span:
+        points, profile_format = reader.parse(text)
+        span.args["points"] = len(points)
+    return points, profile_format
+
+
+def _parse_lines(text):
+    xs = array("d")
+    ys = array("d")
+    profile_format, _ = _parse_into(text.splitlines(), xs, ys)
+    return ProfileArray(xs, ys), profile_format or DEFAULT_FORMAT
+
+
+# Appends the points of the lines to xs and ys. The dialect is sniffed from
+# the first data line unless the caller passes the one found in an earlier
+# block of the same file.
+def _parse_into(lines, xs, ys, profile_format=None, split=None):
+    append_x = xs.append
+    append_y = ys.append
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not _is_data_line(line):
+            continue
+
+        if split is None:
+            profile_format = sniff_format(line)
+            split = _line_splitter(profile_format, line)
+
+        parts = split(line)
+        try:
+            x_val = float(parts[0])
+            y_val = float(parts[1])
+        except (TypeError, IndexError, ValueError):
+            point = _parse_line(line)
+            if point is None:
+                continue
+            x_val, y_val = point
+
+        append_x(x_val)
+        append_y(y_val)
+
+    return profile_format, split
+
+
+def parse_profile_data(data, file_path=None):
+    return parse_profile_text(data.decode(locale.getpreferredencoding(False)), file_path)
+
+
+def read_profile(file_path):
+    with open(file_path, "r", newline="") as handle:
+        text = handle.read()
+    return parse_profile_text(text, file_path)
+
+
+# Keeps the first row in each cell of a square grid, in file order and with
+# the row numbers. The cells start as wide as the resolution, or without a
+# grid when there is none, and grow while more than max_points rows remain.
+# Which rows survive depends on where they lie and not on their position in
+# the file, so interleaved files that alternate upper and lower rows keep
+# both surfaces. The first and last rows and the rows with the smallest and
+# largest x (leading and trailing edge) are always kept.
+class _RowThinning:
+    def __init__(self, max_points=None, resolution=None):
+        self.max_points = max_points
+        self.cell = resolution or None
+        self.cells = set()
+        self.xs = array("d")
+        self.ys = array("d")
+        self.rows = array("q")
+        self.extremes = {}
+
+    # Of several rows at the same extreme x (rounded coordinates), the one
+    # closest to the chord line is the edge.
+    def _note_extreme(self, key, value, xs, ys, first_row):
+        known = self.extremes.get(key)
+        if known is not None and (value - known[1]) * (1 if key == "x_min" else -1) > 0:
+            return
+        index = xs.index(value)
+        best = index
+        while True:
+            try:
+                index = xs.index(value, index + 1)
+            except ValueError:
+                break
+            if abs(ys[index]) < abs(ys[best]):
+                best = index
+        if known is None or value != known[1] or abs(ys[best]) < abs(known[2]):
+            self.extremes[key] = (first_row + best, value, ys[best])
+
+    def add_block(self, xs, ys, first_row):
+        if not xs:
+            return
+        self._note_extreme("x_min", min(xs), xs, ys, first_row)
+        self._note_extreme("x_max", max(xs), xs, ys, first_row)
+        self.extremes["last"] = (first_row + len(xs) - 1, xs[-1], ys[-1])
+
+        rows = range(first_row, first_row + len(xs))
+        if self.cell is None:
+            self.xs.extend(xs)
+            self.ys.extend(ys)
+            self.rows.extend(rows)
+        else:
+            cell = self.cell
+            cells = self.cells
+            for row, x_val, y_val in zip(rows, xs, ys):
+                key = complex(math.floor(x_val / cell), math.floor(y_val / cell))
+                if key not in cells:
+                    cells.add(key)
+                    self.xs.append(x_val)
+                    self.ys.append(y_val)
+                    self.rows.append(row)
+        while self.max_points and len(self.xs) >= 2 * self.max_points:
+            self._coarsen()
+
+    # Without a resolution, the first grid is sized so that a contour around
+    # the kept rows' bounding box crosses about max_points cells; after that
+    # the cell size doubles. Each doubled cell covers whole smaller cells, so
+    # its first row is one already kept and thinning again gives the same
+    # rows as thinning once.
+    def _coarsen(self):
+        if self.cell is None:
+            length = 2.0 * ((max(self.xs) - min(self.xs)) + (max(self.ys) - min(self.ys)))
+            self.cell = length / self.max_points or 1.0
+        else:
+            self.cell *= 2.0
+        cell = self.cell
+        self.cells = cells = set()
+        keep = []
+        for index, (x_val, y_val) in enumerate(zip(self.xs, self.ys)):
+            key = complex(math.floor(x_val / cell), math.floor(y_val / cell))
+            if key not in cells:
+                cells.add(key)
+                keep.append(index)
+        self.xs = array("d", [self.xs[index] for index in keep])
+        self.ys = array("d", [self.ys[index] for index in keep])
+        self.rows = array("q", [self.rows[index] for index in keep])
+
+    def points(self):
+        while self.max_points and len(self.xs) > self.max_points:
+            self._coarsen()
+        for row, x_val, y_val in sorted(set(self.extremes.values())):
+            index = bisect_left(self.rows, row)
+            if index < len(self.rows) and self.rows[index] == row:
+                continue
+            self.rows.insert(index, row)
+            self.xs.insert(index, x_val)
+            self.ys.insert(index, y_val)
+        return ProfileArray(self.xs, self.ys)
+
+
+# Reads a CSV or Selig file in blocks of chunk_size bytes, so neither the
+# text nor a list of all rows is ever held. max_points keeps the first row in
+# each cell of a grid whose cells double in size whenever twice the budget is
+# reached, so at most 2 * max_points rows are buffered and max_points are
+# returned (plus the edge rows). resolution keeps at most one row per square
+# of this size. The content hash of the bytes read, the same as
+# content_hash() of the whole file, is returned with the points.
+# Returns None for layouts that need the whole file, such as Lednicer.
+def stream_profile_file(
+    file_path, max_points=None, resolution=None, chunk_size=STREAM_CHUNK_BYTES
+):
+    start = time.perf_counter()
+    encoding = locale.getpreferredencoding(False)
+    thinning = _RowThinning(max_points, resolution)
+    reader = None
+    profile_format = None
+    split = None
+    rows = 0
+    size = 0
+    digest = hashlib.sha1()
+
+    with open(file_path, "rb") as handle, trace_span(
+        "parse", file=os.path.basename(file_path), streamed=True
+    ) as span:
+        pending = b""
+        while True:
+            chunk = handle.read(chunk_size)
+            size += len(chunk)
+            digest.update(chunk)
+            block = pending + chunk
+            pending = b""
+            if chunk:
+                cut = block.rfind(b"\n") + 1
+                block, pending = block[:cut], block[cut:]
+            if block:
+                text = block.decode(encoding)
+                if reader is None:
+                    reader = find_reader(text, file_path)
+                    span.args["reader"] = reader.name
+                    if reader.name not in _STREAMED_LAYOUTS:
+                        return None
+                xs = array("d")
+                ys = array("d")
+                profile_format, split = _parse_into(
+                    text.splitlines(), xs, ys, profile_format, split
+                )
+                thinning.add_block(xs, ys, rows)
+                rows += len(xs)
+            if not chunk:
+                break
+        points = thinning.points()
+        span.args["rows"] = rows
+        span.args["points"] = len(points)
+
+    if reader is not None and reader.name == SELIG:
+        profile_format = DAT_FORMAT
+    seconds = time.perf_counter() - start
+    return StreamResult(
+        points,
+        profile_format or DEFAULT_FORMAT,
+        rows,
+        size,
+        seconds,
+        rows / seconds if seconds > 0 else 0.0,
+        digest.hexdigest(),
+    )
+
+
+def _read_selig(text):
+    return parse_selig_text(text), DAT_FORMAT
+
+
+# A Lednicer file whose point counts do not add up is read as plain points,
+# without its name and count lines, and goes through the normal corrections.
+def _read_lednicer(text):
+    points = parse_lednicer_text(text)
+    if points is None:
+        return _parse_lines("\n".join(lednicer_point_lines(text)))
+    return points, DAT_FORMAT._replace(layout=LEDNICER)
+
+
+# parse(text) returns (points, ProfileFormat); sniff(lines) gets the first
+# non-empty lines of the file and returns True when it recognises the layout.
+# A reader registered again under the same name replaces the earlier one.
+def register_reader(name, parse, extensions=(), sniff=None):
+    reader = ProfileReader(name, tuple(ext.lower() for ext in extensions), sniff, parse)
+    for index, known in enumerate(_readers):
+        if known.name == name:
+            _readers[index] = reader
+            return reader
+    _readers.append(reader)
+    return reader
+
+
+def profile_extensions():
+    return sorted({ext for reader in _readers for ext in reader.extensions})
+
+
+# Readers registered for the file's extension are sniffed in registration
+# order and the first of them is the default. Without a known extension all
+# readers are sniffed and CSV is the default.
+def find_reader(text, file_path=None):
+    candidates = []
+    if file_path:
+        ext = os.path.splitext(file_path)[1].lower()
+        candidates = [reader for reader in _readers if ext in reader.extensions]
+
+    lines = []
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if line:
+            lines.append(line)
+            if len(lines) >= SNIFF_LINES:
+                break
+    for reader in candidates or _readers:
+        if reader.sniff is not None and reader.sniff(lines):
+            return reader
+    if candidates:
+        return candidates[0]
+    return next(reader for reader in _readers if reader.name == CSV)
+
+
+register_reader(CSV, _parse_lines, (".csv", ".txt"))
+register_reader(SELIG, _read_selig, (".dat",), sniff_selig)
+register_reader(LEDNICER, _read_lednicer, (".dat",), sniff_lednicer)
@@ -0,0 +1,120 @@
+# Resample profile surfaces onto a fixed number of chordwise stations.
+# Files with very different point counts loft badly against each other, so
+# both surfaces can be redistributed onto the same station grid. Grids are
+# given as chord fractions from 0 (leading edge) to 1 (trailing edge) and are
+# kept in a small registry keyed by spacing and count. Input profiles must
+# already be validated, because the surfaces are split by point order.
+
+import math
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+
+from .profile_array import HAS_NUMPY, ProfileArray, np
+from .profile_split import split_at_leading_edge
+
+COSINE = "cosine"
+HALF_COSINE = "half_cosine"
+UNIFORM = "uniform"
+SPACINGS = (COSINE, HALF_COSINE, UNIFORM)
+
+STATION_GRID_LIMIT = 16
+
+_station_grids = OrderedDict()
+
+
+def _grid_values(count, spacing):
+    last = count - 1
+    if spacing == COSINE:
+        return [0.5 * (1.0 - math.cos(math.pi * idx / last)) for idx in range(count)]
+    if spacing == HALF_COSINE:
+        return [1.0 - math.cos(0.5 * math.pi * idx / last) for idx in range(count)]
+    return [idx / last for idx in range(count)]
+
+
+def station_grid(count, spacing=COSINE):
+    if spacing not in SPACINGS:
+        raise ValueError(f"Unknown station spacing: {spacing}.")
+    if count < 2:
+        raise ValueError("At least two chordwise stations are required.")
+
+    key = (spacing, count)
+    grid = _station_grids.get(key)
+    if grid is None:
+        grid = tuple(_grid_values(count, spacing))
+        _station_grids[key] = grid
+        while len(_station_grids) > STATION_GRID_LIMIT:
+            _station_grids.popitem(last=False)
+    else:
+        _station_grids.move_to_end(key)
+    return grid
+
+
+def clear_station_grids():
+    _station_grids.clear()
+
+
+# xs must be sorted ascending; targets outside the range are clamped to the
+# first or last point.
+def interpolation_weights(xs, targets):
+    count = len(xs)
+    if count < 2:
+        raise ValueError("At least two points are required for interpolation.")
+    if HAS_NUMPY:
+        xs = np.asarray(xs, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        lower = np.clip(np.searchsorted(xs, targets, side="right") - 1, 0, count - 2)
+        span = xs[lower + 1] - xs[lower]
+        safe_span = np.where(span > 0, span, 1.0)
+        frac = np.where(span > 0, (targets - xs[lower]) / safe_span, 0.0)
+        return lower, np.clip(frac, 0.0, 1.0)
+
+    xs = list(xs)
+    lower = array("l")
+    frac = array("d")
+    for target in targets:
+        idx = min(max(bisect_right(xs, target) - 1, 0), count - 2)
+        span = xs[idx + 1] - xs[idx]
+        value = (target - xs[idx]) / span if span > 0 else 0.0
+        lower.append(idx)
+        frac.append(min(1.0, max(0.0, value)))
+    return lower, frac
+
+
+def interpolate(values, weights):
+    lower, frac = weights
+    if HAS_NUMPY:
+        values = np.asarray(values, dtype=np.float64)
+        return values[lower] * (1.0 - frac) + values[lower + 1] * frac
+    return array("d", [
+        values[idx] * (1.0 - t) + values[idx + 1] * t for idx, t in zip(lower, frac)
+    ])
+
+
+# Stations are spread over the surface's own x extent, so a surface that
+# ends short of the chord (open or cut trailing edge) keeps its end point.
+def resample_surface(surface, stations):
+    surface = ProfileArray.from_points(surface)
+    xs = surface.xs
+    start = float(xs[0])
+    length = float(xs[-1]) - start
+    if HAS_NUMPY:
+        targets = start + np.asarray(stations, dtype=np.float64) * length
+    else:
+        targets = array("d", [start + station * length for station in stations])
+    return ProfileArray(targets, interpolate(surface.ys, interpolation_weights(xs, targets)))
+
+
+def resample_profile(points, count, spacing=COSINE):
+    lower_pts, upper_pts = split_at_leading_edge(points)
+    if len(lower_pts) < 2 or len(upper_pts) < 2:
+        raise ValueError("Not enough points to build upper and lower curves.")
+
+    stations = station_grid(count, spacing)
+    upper = resample_surface(upper_pts, stations)
+    lower = resample_surface(lower_pts, stations)
+    # Keep the trailing edge upper -> leading edge -> trailing edge lower
+    # order; a shared leading-edge point is written only once.
+    if upper[0] == lower[0]:
+        lower = lower[1:]
+    return upper[::-1] + lower
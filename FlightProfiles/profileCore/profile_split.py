@@ -0,0 +1,124 @@
+# Split a validated profile into lower and upper point runs for the
+# sketch splines. Both runs are returned as ProfileArrays sorted by
+# increasing x; the x order comes from the profile's shared SortedProfile
+# index.
+
+from .profile_array import HAS_NUMPY, ProfileArray, np
+
+
+def _is_increasing(xs, strict=False):
+    if HAS_NUMPY:
+        steps = np.diff(xs)
+        return bool((steps > 0).all() if strict else (steps >= 0).all())
+    if strict:
+        return all(xs[idx] < xs[idx + 1] for idx in range(len(xs) - 1))
+    return all(xs[idx] <= xs[idx + 1] for idx in range(len(xs) - 1))
+
+
+def group_by_x(points):
+    sorted_points = list(ProfileArray.from_points(points).sorted_profile().sorted_points())
+    if len(sorted_points) < 3:
+        return None
+
+    dxs = [
+        sorted_points[idx + 1][0] - sorted_points[idx][0]
+        for idx in range(len(sorted_points) - 1)
+    ]
+    dxs = [dx for dx in dxs if dx > 0]
+    if len(dxs) < 2:
+        return None
+
+    dxs_sorted = sorted(dxs)
+    small_idx = max(0, int(len(dxs_sorted) * 0.2) - 1)
+    small_dx = dxs_sorted[small_idx]
+    median_dx = dxs_sorted[len(dxs_sorted) // 2]
+    if median_dx <= 0 or small_dx > median_dx * 0.25:
+        return None
+
+    tol = small_dx * 1.5 if small_dx > 0 else median_dx * 0.1
+    groups = []
+    current = [sorted_points[0]]
+
+    for point in sorted_points[1:]:
+        if abs(point[0] - current[-1][0]) <= tol:
+            current.append(point)
+        else:
+            groups.append(current)
+            current = [point]
+
+    groups.append(current)
+
+    paired_groups = [group for group in groups if len(group) >= 2]
+    if len(paired_groups) < 2:
+        return None
+
+    lower_pts = []
+    upper_pts = []
+    for group in groups:
+        low_pt = min(group, key=lambda p: p[1])
+        up_pt = max(group, key=lambda p: p[1])
+        lower_pts.append((low_pt[0], low_pt[1]))
+        upper_pts.append((up_pt[0], up_pt[1]))
+
+    return ProfileArray.from_points(lower_pts), ProfileArray.from_points(upper_pts)
+
+
+def split_profile(points):
+    points = ProfileArray.from_points(points)
+    grouped = group_by_x(points)
+    if grouped:
+        return grouped
+
+    index = points.sorted_profile()
+    sorted_points = list(index.sorted_points())
+    groups = []
+    current = [sorted_points[0]]
+
+    for x_val, y_val in sorted_points[1:]:
+        if abs(x_val - current[-1][0]) <= 1e-6:
+            current.append((x_val, y_val))
+        else:
+            groups.append(current)
+            current = [(x_val, y_val)]
+
+    groups.append(current)
+
+    paired_count = sum(1 for group in groups if len(group) >= 2)
+    if paired_count >= max(3, len(groups) // 4):
+        lower_pts = []
+        upper_pts = []
+        for group in groups:
+            ys = [point[1] for point in group]
+            x_val = group[0][0]
+            lower_pts.append((x_val, min(ys)))
+            upper_pts.append((x_val, max(ys)))
+        return ProfileArray.from_points(lower_pts), ProfileArray.from_points(upper_pts)
+
+    # Monotone surfaces are returned as views into the contour; only
+    # surfaces that double back on themselves are sorted into new buffers.
+    min_idx = index.le_index
+    upper_pts = points[min_idx::-1]
+    if not _is_increasing(upper_pts.xs, strict=True):
+        upper_pts = index.sorted_range(0, min_idx + 1)
+    lower_pts = points[min_idx:]
+    if not _is_increasing(lower_pts.xs):
+        lower_pts = index.sorted_range(min_idx)
+    return lower_pts, upper_pts
+
+
+# Split a validated contour (trailing edge upper -> leading edge -> trailing
+# edge lower) by its order alone. Unlike split_profile, no point is ever
+# shared between the surfaces except the leading edge itself.
+def split_at_leading_edge(points):
+    points = ProfileArray.from_points(points)
+    tolerances = points.tolerances() if len(points) else None
+    if not tolerances:
+        raise ValueError("Invalid profile data: chord length is zero.")
+    x_min, _, _, x_tol, _ = tolerances
+
+    first_le = points.argmin_x()
+    last_le = first_le
+    xs = points.xs
+    while last_le + 1 < len(points) and xs[last_le + 1] - x_min <= x_tol:
+        last_le += 1
+    return points[last_le:], points[first_le::-1]
@@ -0,0 +1,161 @@
+# Memoized stage graph for the profile import pipeline.
+# Each stage output is cached under a key chained from the upstream key and
+# the stage's own parameters, so changing one parameter only recomputes the
+# stages from that point on. The graph starts from validated points: loading,
+# correcting and validating stay with the loader, which also knows the file
+# format and the layout. The surfaces are split before the alignment and
+# twist rotations, because the split works in profile coordinates.
+# Steps that combine several chains, such as blending the stations, are kept
+# with cached() under a key built from the upstream keys.
+
+from collections import OrderedDict, namedtuple
+
+from .profile_array import ProfileArray
+from .profile_decimate import decimate_profile_surfaces
+from .profile_resample import COSINE, resample_profile
+from .profile_split import split_at_leading_edge, split_profile
+from .profile_trace import trace_span
+
+Stage = namedtuple("Stage", ["name", "func", "params"])
+StageRun = namedtuple("StageRun", ["value", "key", "outputs", "computed"])
+ProfileSurfaces = namedtuple("ProfileSurfaces", ["lower", "upper", "max_error"], defaults=(0.0,))
+
+
+class StageGraph:
+    def __init__(self, stages, defaults=None, max_entries=16):
+        self.stages = tuple(stages)
+        self.defaults = dict(defaults or {})
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._index = {stage.name: idx for idx, stage in enumerate(self.stages)}
+        self._memo = {stage.name: OrderedDict() for stage in self.stages}
+
+    def _span(self, start, stop):
+        begin = self._index[start] if start else 0
+        end = self._index[stop] + 1 if stop else len(self.stages)
+        return self.stages[begin:end]
+
+    def run(self, source, source_key, params=None, start=None, stop=None):
+        values = dict(self.defaults)
+        values.update(params or {})
+
+        key = source_key
+        value = source
+        outputs = {}
+        computed = []
+        for stage in self._span(start, stop):
+            args = tuple(values[name] for name in stage.params)
+            key = (key, args)
+            value, hit = self._lookup(
+                stage.name, key, stage.func, (value, *args), points=_point_count(value)
+            )
+            if not hit:
+                computed.append(stage.name)
+            outputs[stage.name] = value
+        return StageRun(value, key, outputs, computed)
+
+    def cached(self, name, key, func, *args):
+        value, _ = self._lookup(name, key, func, args)
+        return value
+
+    def _lookup(self, name, key, func, args, **span):
+        memo = self._memo.setdefault(name, OrderedDict())
+        if key in memo:
+            memo.move_to_end(key)
+            self.hits += 1
+            return memo[key], True
+        with trace_span(name, **span):
+            value = func(*args)
+        memo[key] = value
+        while len(memo) > self.max_entries:
+            memo.popitem(last=False)
+        self.misses += 1
+        return value, False
+
+    def clear(self):
+        for memo in self._memo.values():
+            memo.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {
+            "stages": len(self.stages),
+            "entries": sum(len(memo) for memo in self._memo.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _point_count(value):
+    if isinstance(value, ProfileSurfaces):
+        return len(value.lower) + len(value.upper)
+    if isinstance(value, ProfileArray):
+        return len(value)
+    return None
+
+
+def _resample(points, count, spacing):
+    if count < 2:
+        return points
+    return resample_profile(points, count, spacing)
+
+
+def _mirror(points, mirror):
+    return points.mirrored() if mirror else points
+
+
+def _split(points, ordered):
+    if ordered:
+        lower_pts, upper_pts = split_at_leading_edge(points)
+    else:
+        lower_pts, upper_pts = split_profile(points)
+    if len(lower_pts) < 2 or len(upper_pts) < 2:
+        raise ValueError("Not enough points to build upper and lower curves.")
+    return ProfileSurfaces(
+        ProfileArray.from_points(lower_pts), ProfileArray.from_points(upper_pts)
+    )
+
+
+def _decimate(surfaces, fit_tolerance):
+    if fit_tolerance <= 0:
+        return surfaces
+    lower, upper = decimate_profile_surfaces(surfaces.lower, surfaces.upper, fit_tolerance)
+    return ProfileSurfaces(lower.points, upper.points, max(lower.max_error, upper.max_error))
+
+
+def _rotate(surfaces, angle_rad, pivot):
+    if pivot is None:
+        return surfaces
+    return surfaces._replace(
+        lower=surfaces.lower.rotated(angle_rad, pivot),
+        upper=surfaces.upper.rotated(angle_rad, pivot),
+    )
+
+
+PROFILE_STAGES = (
+    Stage("resample", _resample, ("resample_count", "resample_spacing")),
+    Stage("scale", lambda points, depth: points.scaled(depth), ("depth",)),
+    Stage("mirror", _mirror, ("mirror",)),
+    Stage("split", _split, ("ordered",)),
+    Stage("decimate", _decimate, ("fit_tolerance",)),
+    Stage("align", lambda surfaces, angle: _rotate(surfaces, angle, (0.0, 0.0)), ("align_angle",)),
+    Stage("rotate", _rotate, ("rotation", "pivot")),
+)
+
+STAGE_DEFAULTS = {
+    "resample_count": 0,
+    "resample_spacing": COSINE,
+    "depth": 1.0,
+    "mirror": False,
+    "ordered": False,
+    "fit_tolerance": 0.0,
+    "align_angle": 0.0,
+    "rotation": 0.0,
+    "pivot": None,
+}
+
+
+def profile_stage_graph(max_entries=16):
+    return StageGraph(PROFILE_STAGES, STAGE_DEFAULTS, max_entries)
@@ -0,0 +1,118 @@
+# Binary sidecar files for normalized profiles.
+# Layout (little endian):
+#   magic (8 bytes) | source SHA-1 (20 bytes) | point count (uint64) |
+#   metadata length (uint32) | metadata JSON, padded to 8 bytes |
+#   x values (float64 * n) | y values (float64 * n)
+# The float block is read through a memory map on load, so a validated
+# profile comes back without parsing or re-validation. The values are copied
+# out and the map is closed before returning: a sidecar still mapped by a
+# cached profile could not be replaced on Windows.
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from .profile_array import HAS_NUMPY, ProfileArray, np
+from .profile_reader import ProfileFormat
+
+SIDECAR_DIR = ".flightprofiles"
+SIDECAR_EXT = ".fpprof"
+
+# The last byte is the layout version. It is raised whenever normalizing can
+# give other points, so sidecars of an older version are made again.
+_MAGIC = b"FPPROF\x00\x02"
+_HEADER = struct.Struct("<8s20sQI")
+
+SidecarProfile = namedtuple("SidecarProfile", ["points", "corrections", "profile_format"])
+
+
+def sidecar_path(file_path):
+    directory = os.path.dirname(os.path.abspath(file_path))
+    base_name = os.path.basename(file_path)
+    return os.path.join(directory, SIDECAR_DIR, f"{base_name}{SIDECAR_EXT}")
+
+
+def _pad(length):
+    return (-length) % 8
+
+
+def write_sidecar(file_path, digest, points, corrections=(), profile_format=None):
+    points = ProfileArray.from_points(points)
+    meta = {"corrections": list(corrections)}
+    if profile_format is not None:
+        meta["format"] = list(profile_format)
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    meta_bytes += b" " * _pad(_HEADER.size + len(meta_bytes))
+
+    xs = array("d", points.xs)
+    ys = array("d", points.ys)
+    if sys.byteorder != "little":
+        xs.byteswap()
+        ys.byteswap()
+
+    path = sidecar_path(file_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.write(
+                _HEADER.pack(_MAGIC, bytes.fromhex(digest), len(points), len(meta_bytes))
+            )
+            handle.write(meta_bytes)
+            handle.write(xs.tobytes())
+            handle.write(ys.tobytes())
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def _read_block(mapped, offset, count):
+    if HAS_NUMPY:
+        return np.frombuffer(mapped, dtype="<f8", count=count, offset=offset).copy()
+    values = array("d")
+    values.frombytes(mapped[offset:offset + count * 8])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def read_sidecar(file_path, digest):
+    path = sidecar_path(file_path)
+    try:
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < _HEADER.size:
+                return None
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, stored_digest, count, meta_len = _HEADER.unpack_from(mapped, 0)
+        if magic != _MAGIC or stored_digest != bytes.fromhex(digest):
+            return None
+        data_offset = _HEADER.size + meta_len
+        if size < data_offset + count * 16:
+            return None
+        meta = json.loads(mapped[_HEADER.size:data_offset].decode("utf-8"))
+        xs = _read_block(mapped, data_offset, count)
+        ys = _read_block(mapped, data_offset + count * 8, count)
+    except (struct.error, ValueError):
+        return None
+    finally:
+        mapped.close()
+
+    profile_format = meta.get("format")
+    if profile_format is not None:
+        profile_format = ProfileFormat(*profile_format)
+    return SidecarProfile(
+        ProfileArray(xs, ys), tuple(meta.get("corrections", ())), profile_format
+    )
+
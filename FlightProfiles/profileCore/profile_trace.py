@@ -0,0 +1,161 @@
+# Timing and memory spans for one import.
+# A Tracer records nested spans (wall time, point counts and, optionally,
+# the tracemalloc peak while the span was open) from any thread. With a trace
+# file, Chrome-trace begin and end events are appended and flushed as they
+# happen. The JSON array format may stay unterminated, so after an import
+# hangs the file ends in the span that never finished. Open the file in
+# chrome://tracing or https://ui.perfetto.dev.
+#
+# Core functions call trace_span(); it only records while a tracer is
+# installed with tracing(), and costs one global lookup otherwise.
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class Span:
+    __slots__ = ("name", "args", "thread_id", "start_ns", "duration_ns", "memory_peak")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.thread_id = threading.get_ident()
+        self.start_ns = 0
+        self.duration_ns = 0
+        self.memory_peak = None
+
+    @property
+    def seconds(self):
+        return self.duration_ns / 1e9
+
+
+class Tracer:
+    def __init__(self, trace_path=None, memory=False):
+        self.spans = []
+        self.memory = memory
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._end = None
+        self._open_peaks = {}
+        self._own_tracemalloc = memory and not tracemalloc.is_tracing()
+        self._handle = None
+        self._events = 0
+        if self._own_tracemalloc:
+            tracemalloc.start()
+        if trace_path:
+            os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+            self._handle = open(trace_path, "w", encoding="utf-8")
+            self._handle.write("[\n")
+            self._emit({"name": "process_name", "ph": "M", "args": {"name": "FlightProfiles"}})
+
+    def _emit(self, event):
+        if self._handle is None:
+            return
+        event.setdefault("pid", os.getpid())
+        self._handle.write((",\n" if self._events else "") + json.dumps(event))
+        self._handle.flush()
+        self._events += 1
+
+    # The traced peak is reset at every span boundary and credited to every
+    # span open at that moment, so overlapping spans from worker threads
+    # each get the peak of their own lifetime.
+    def _update_peaks(self):
+        peak = tracemalloc.get_traced_memory()[1]
+        for key, value in self._open_peaks.items():
+            self._open_peaks[key] = max(value, peak)
+        tracemalloc.reset_peak()
+
+    @contextmanager
+    def span(self, name, **args):
+        span = Span(name, args)
+        with self._lock:
+            if self.memory:
+                self._update_peaks()
+                self._open_peaks[id(span)] = tracemalloc.get_traced_memory()[0]
+            span.start_ns = time.perf_counter_ns()
+            self._emit({
+                "name": name,
+                "ph": "B",
+                "ts": (span.start_ns - self._origin) / 1000.0,
+                "tid": span.thread_id,
+            })
+        try:
+            yield span
+        finally:
+            with self._lock:
+                end_ns = time.perf_counter_ns()
+                span.duration_ns = end_ns - span.start_ns
+                if self.memory:
+                    self._update_peaks()
+                    span.memory_peak = self._open_peaks.pop(id(span))
+                    span.args["memory_peak_kb"] = round(span.memory_peak / 1024.0, 1)
+                self.spans.append(span)
+                self._emit({
+                    "name": name,
+                    "ph": "E",
+                    "ts": (end_ns - self._origin) / 1000.0,
+                    "tid": span.thread_id,
+                    "args": span.args,
+                })
+
+    def close(self):
+        with self._lock:
+            if self._end is None:
+                self._end = time.perf_counter_ns()
+            if self._handle is not None:
+                self._handle.write("\n]\n")
+                self._handle.close()
+                self._handle = None
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+                self._own_tracemalloc = False
+
+    @property
+    def seconds(self):
+        end = self._end if self._end is not None else time.perf_counter_ns()
+        return (end - self._origin) / 1e9
+
+    # One line with the total, the memory peak and, per span name in order
+    # of appearance, the number of spans and their summed wall time.
+    def summary(self):
+        totals = {}
+        for span in sorted(self.spans, key=lambda span: span.start_ns):
+            count, seconds = totals.get(span.name, (0, 0.0))
+            totals[span.name] = (count + 1, seconds + span.seconds)
+
+        header = f"trace {self.seconds * 1000.0:.1f} ms"
+        peaks = [span.memory_peak for span in self.spans if span.memory_peak is not None]
+        if peaks:
+            header += f", peak {max(peaks) / 2 ** 20:.1f} MB"
+        parts = [
+            f"{name} {count}x {seconds * 1000.0:.1f} ms" if count > 1
+            else f"{name} {seconds * 1000.0:.1f} ms"
+            for name, (count, seconds) in totals.items()
+        ]
+        return f"{header}: {', '.join(parts)}"
+
+
+_active = None
+
+
+@contextmanager
+def tracing(tracer):
+    global _active
+    previous = _active
+    _active = tracer
+    try:
+        yield tracer
+    finally:
+        _active = previous
+        tracer.close()
+
+
+def trace_span(name, **args):
+    tracer = _active
+    if tracer is None:
+        return nullcontext(Span(name, args))
+    return tracer.span(name, **args)
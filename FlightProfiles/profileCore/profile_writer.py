@@ -0,0 +1,84 @@
+# Writer for corrected "_sort" CSV files.
+# A file whose content would not change is left untouched, so re-running an
+# import keeps its timestamp; otherwise the data goes to a temporary file
+# that replaces the old one in a single rename, and an interrupted write
+# never leaves a truncated file behind.
+
+import os
+from collections import namedtuple
+
+from .profile_cache import content_hash
+
+SortedProfileFile = namedtuple("SortedProfileFile", ["path", "digest", "written"])
+
+
+def sorted_profile_path(file_path):
+    directory = os.path.dirname(file_path)
+    base_name = os.path.basename(file_path)
+    name, ext = os.path.splitext(base_name)
+    if name.endswith("_sort"):
+        new_name = name
+    else:
+        new_name = f"{name}_sort"
+    return os.path.join(directory, f"{new_name}{ext}")
+
+
+def format_sorted_profile(points, profile_format):
+    delimiter = profile_format.delimiter
+    decimal_sep = profile_format.decimal_sep
+    include_z = profile_format.include_z
+    fmt = "{:.8f}"
+
+    def format_value(value):
+        text = fmt.format(value)
+        if decimal_sep != ".":
+            text = text.replace(".", decimal_sep)
+        return text
+
+    lines = []
+    for x_val, y_val in points:
+        x_text = format_value(x_val)
+        y_text = format_value(y_val)
+        if include_z:
+            z_text = format_value(0.0)
+            lines.append(f"{x_text}{delimiter}{y_text}{delimiter}{z_text}")
+        else:
+            lines.append(f"{x_text}{delimiter}{y_text}")
+
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+def _same_content(path, data, digest):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as handle:
+            return content_hash(handle.read()) == digest
+    except OSError:
+        return False
+
+
+# Returns False when the file already holds exactly this data.
+def write_file_if_changed(path, data, digest=None):
+    digest = digest or content_hash(data)
+    if _same_content(path, data, digest):
+        return False
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def write_sorted_profile_file(file_path, points, profile_format):
+    new_path = sorted_profile_path(file_path)
+    data = format_sorted_profile(points, profile_format)
+    digest = content_hash(data)
+    written = write_file_if_changed(new_path, data, digest)
+    return SortedProfileFile(new_path, digest, written)
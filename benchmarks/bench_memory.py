@@ -0,0 +1,137 @@
+# Memory use of large in-memory profile sets, without Fusion.
+#
+# Usage (from the repository root):
+#   python benchmarks/bench_memory.py
+#   python benchmarks/bench_memory.py --profiles 10000 --points 200 --output memory.json
+#
+# Every layout is built from the same generated NACA 4-digit profiles and
+# measured with tracemalloc, so the figures include all object overhead.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from FlightProfiles.profileCore import (  # noqa: E402
+    HAS_NUMPY,
+    ProfileArray,
+    ProfilePack,
+    split_at_leading_edge,
+    split_profile,
+)
+from bench_pipeline import _git_revision  # noqa: E402
+from synthetic_profiles import ordered_profile  # noqa: E402
+
+DEFAULT_PROFILES = 10000
+DEFAULT_POINTS = 200
+CODES = ("0012", "2412", "4415", "6409")
+
+
+# New float objects, as a CSV parser would create them.
+def _tuple_list(points):
+    return [(x_val + 0.0, y_val + 0.0) for x_val, y_val in points]
+
+
+def _tuple_surfaces(points):
+    le_idx = min(range(len(points)), key=lambda idx: points[idx][0])
+    return points[le_idx:], points[le_idx::-1]
+
+
+LAYOUTS = (
+    ("tuple_lists", lambda profiles: [_tuple_list(points) for points in profiles]),
+    ("profile_arrays", lambda profiles: [ProfileArray.from_points(p) for p in profiles]),
+    ("profile_pack", ProfilePack),
+)
+
+SURFACES = (
+    ("tuple_list_slices", "tuple_lists", lambda profiles: list(map(_tuple_surfaces, profiles))),
+    ("split_profile", "profile_arrays", lambda profiles: list(map(split_profile, profiles))),
+    ("split_views", "profile_pack", lambda profiles: list(map(split_at_leading_edge, profiles))),
+)
+
+
+def _measure(build, source):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build(source)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return value, used
+
+
+def _result(name, used, profile_count, point_count):
+    return {
+        "layout": name,
+        "bytes": used,
+        "bytes_per_point": used / point_count if point_count else 0.0,
+        "mb_per_10k_profiles": used * 10000 / profile_count / 2 ** 20 if profile_count else 0.0,
+    }
+
+
+def bench_memory(profile_count, points_per_profile):
+    profiles = [
+        ordered_profile(points_per_profile, CODES[idx % len(CODES)])
+        for idx in range(profile_count)
+    ]
+    point_count = sum(len(points) for points in profiles)
+
+    results = []
+    built = {}
+    for name, build in LAYOUTS:
+        built[name], used = _measure(build, profiles)
+        results.append(_result(name, used, profile_count, point_count))
+    for name, layout, build in SURFACES:
+        _, used = _measure(build, built[layout])
+        results.append(_result(name, used, profile_count, point_count))
+    return point_count, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory use of profile layouts.")
+    parser.add_argument("--profiles", type=int, default=DEFAULT_PROFILES)
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS)
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    point_count, results = bench_memory(args.profiles, args.points)
+    print(
+        f"{args.profiles} profiles, {point_count} points "
+        f"({time.perf_counter() - start:.2f} s)",
+        file=sys.stderr,
+    )
+    for result in results:
+        print(
+            f"{result['layout']:<28} {result['bytes_per_point']:>8.1f} B/point "
+            f"{result['mb_per_10k_profiles']:>9.2f} MB per 10k profiles"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "numpy": HAS_NUMPY,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "profiles": args.profiles,
+                "points": point_count,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
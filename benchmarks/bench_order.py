@@ -0,0 +1,94 @@
+# Time and result of both point orderings on unordered point clouds, without
+# Fusion.
+#
+# Usage (from the repository root):
+#   python benchmarks/bench_order.py
+#   python benchmarks/bench_order.py --sizes 1000 100000 --codes 6409 --output order.json
+#
+# Generated NACA profiles are sampled like a 3D scan (each surface at its own
+# stations, slight noise, rows shuffled) and normalized with the x grouping
+# and with nearest-neighbour chaining. Besides the time and the validation
+# result, the area the ordered contour encloses is compared with the area of
+# the exact profile: a wrong order that still validates shows up there.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from FlightProfiles.profileCore import (  # noqa: E402
+    HAS_NUMPY,
+    ORDERINGS,
+    normalize_profile,
+    outline_properties,
+)
+from bench_pipeline import _git_revision  # noqa: E402
+from synthetic_profiles import ordered_profile, scanned_profile  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_CODES = ("2412", "6409")
+REFERENCE_POINTS = 20000
+
+
+def bench_order(sizes, codes):
+    results = []
+    for code in codes:
+        reference = abs(outline_properties(ordered_profile(REFERENCE_POINTS, code)).area)
+        for size in sizes:
+            cloud = scanned_profile(size, code)
+            for ordering in ORDERINGS:
+                start = time.perf_counter()
+                points, diagnostics, _ = normalize_profile(cloud, False, ordering)
+                seconds = time.perf_counter() - start
+                area = abs(outline_properties(points).area) if len(points) > 2 else 0.0
+                results.append({
+                    "code": code,
+                    "points": size,
+                    "ordering": ordering,
+                    "seconds": seconds,
+                    "kept": len(points),
+                    "error": diagnostics.first_error(),
+                    "area_error": abs(area - reference) / reference,
+                })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the point orderings on point clouds.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--codes", nargs="+", default=list(DEFAULT_CODES))
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args(argv)
+
+    results = bench_order(args.sizes, args.codes)
+    for result in results:
+        print(
+            f"NACA {result['code']} {result['points']:>8} {result['ordering']:<9} "
+            f"{result['seconds']:>7.2f} s {result['kept']:>8} kept "
+            f"area {result['area_error'] * 100:>6.2f} % {result['error'] or 'valid'}"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "numpy": HAS_NUMPY,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
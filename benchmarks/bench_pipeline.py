@@ -0,0 +1,187 @@
+# Stage timings for the profile import pipeline, without Fusion.
+#
+# Usage (from the repository root):
+#   python benchmarks/bench_pipeline.py --output bench.json
+#   python benchmarks/bench_pipeline.py --sizes 100 1000 --compare bench.json
+#
+# Results are written as JSON so runs from different commits can be compared.
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from FlightProfiles.profileCore import (  # noqa: E402
+    HAS_NUMPY,
+    ProfileArray,
+    cleanup_trailing_edge,
+    group_by_x,
+    is_interleaved_profile,
+    normalize_profile_points,
+    parse_profile_data,
+    sort_interleaved_profile,
+    split_profile,
+    trailing_edge_duplicate_count,
+    validate_profile_sequence,
+)
+from synthetic_profiles import VARIANTS, profile_csv_text  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+
+
+def _time_stage(func, repeat, min_time):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    number = max(1, int(min_time / elapsed)) if elapsed > 0 else 1000
+
+    best = elapsed
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _stages(data, points, tolerances, normalized):
+    _, x_max, _, x_tol, y_tol = tolerances
+    stages = [
+        ("parse", lambda: parse_profile_data(data)),
+        ("tolerances", lambda: ProfileArray(points.xs, points.ys).tolerances()),
+        ("te_dedupe", lambda: trailing_edge_duplicate_count(points, x_max, x_tol, y_tol)),
+        ("interleave_detect", lambda: is_interleaved_profile(points, y_tol)),
+        ("sort_interleaved", lambda: sort_interleaved_profile(points, x_tol, y_tol)),
+        ("cleanup_te", lambda: cleanup_trailing_edge(points, x_tol, y_tol)),
+        ("normalize", lambda: normalize_profile_points(points)),
+    ]
+    if normalized is not None:
+        stages.extend([
+            ("validate", lambda: validate_profile_sequence(normalized)),
+            ("group_by_x", lambda: group_by_x(normalized)),
+            ("split", lambda: split_profile(normalized)),
+            ("scale", lambda: normalized.scaled(2.5)),
+            ("rotate", lambda: normalized.rotated(0.05, (0.25, 0.0))),
+        ])
+    return stages
+
+
+def bench_dataset(name, variant, data, repeat, min_time):
+    points, _ = parse_profile_data(data)
+    tolerances = points.tolerances()
+    if not tolerances:
+        return []
+    normalized, error, corrections = normalize_profile_points(points)
+
+    results = []
+    for stage, func in _stages(data, points, tolerances, normalized):
+        results.append({
+            "dataset": name,
+            "variant": variant,
+            "points": len(points),
+            "stage": stage,
+            "seconds": _time_stage(func, repeat, min_time),
+            "error": error,
+            "corrections": corrections,
+        })
+    return results
+
+
+def iter_datasets(sizes, include_files=True):
+    if include_files:
+        for file_path in sorted(glob.glob(os.path.join(ROOT, "Profiles", "*.csv"))):
+            with open(file_path, "rb") as handle:
+                yield os.path.basename(file_path), "file", handle.read()
+    for size in sizes:
+        for variant, generator in VARIANTS.items():
+            data = profile_csv_text(generator(size)).encode("ascii")
+            yield f"naca2412_{size}", variant, data
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(current, baseline):
+    def key(result):
+        return result["dataset"], result["variant"], result["stage"]
+
+    previous = {key(result): result["seconds"] for result in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        old = previous.get(key(result))
+        if not old:
+            continue
+        ratio = old / result["seconds"] if result["seconds"] > 0 else float("inf")
+        lines.append(
+            f"{result['dataset']:<24} {result['variant']:<12} {result['stage']:<18} "
+            f"{old * 1e3:>10.3f} ms -> {result['seconds'] * 1e3:>10.3f} ms  x{ratio:.2f}"
+        )
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the profile import pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--min-time", type=float, default=0.02, help="Minimum seconds per timed loop."
+    )
+    parser.add_argument("--no-files", action="store_true", help="Skip Profiles/*.csv.")
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    parser.add_argument("--compare", help="Print speedups against a previous JSON result.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, variant, data in iter_datasets(args.sizes, not args.no_files):
+        start = time.perf_counter()
+        dataset_results = bench_dataset(name, variant, data, args.repeat, args.min_time)
+        results.extend(dataset_results)
+        print(
+            f"{name:<24} {variant:<12} {len(dataset_results):>2} stages "
+            f"{time.perf_counter() - start:8.2f} s",
+            file=sys.stderr,
+        )
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "numpy": HAS_NUMPY,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        print("\n".join(compare_results(report, baseline)))
+    elif not args.output:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# Throughput and peak memory of reading one very large point file, without
+# Fusion.
+#
+# Usage (from the repository root):
+#   python benchmarks/bench_stream.py
+#   python benchmarks/bench_stream.py --rows 1000000 --max-points 20000 --output stream.json
+#
+# Generated NACA 2412 CSVs with the given number of rows, one ordered and
+# one alternating lower and upper surface rows, are read at once
+# (read_profile) and in blocks (stream_profile_file) with and without
+# thinning. Times are taken without tracemalloc; the memory peak is measured
+# in a second run. The thinned points are normalized afterwards, so thinning
+# that loses a surface shows up as an error.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from FlightProfiles.profileCore import (  # noqa: E402
+    HAS_NUMPY,
+    normalize_profile,
+    read_profile,
+    stream_profile_file,
+)
+from bench_pipeline import _git_revision  # noqa: E402
+from synthetic_profiles import VARIANTS, profile_csv_text  # noqa: E402
+
+DEFAULT_ROWS = 1000000
+DEFAULT_MAX_POINTS = 20000
+DEFAULT_RESOLUTION = 0.001
+LAYOUTS = ("ordered", "interleaved")
+
+
+def _write_profile(file_path, rows, layout):
+    with open(file_path, "w", encoding="ascii") as handle:
+        handle.write(profile_csv_text(VARIANTS[layout](rows, "2412")))
+
+
+def _points(value):
+    return value.points if hasattr(value, "points") else value[0]
+
+
+def _point_count(value):
+    return len(_points(value))
+
+
+def _measure(read):
+    gc.collect()
+    start = time.perf_counter()
+    value = read()
+    seconds = time.perf_counter() - start
+    points = _point_count(value)
+    del value
+
+    gc.collect()
+    tracemalloc.start()
+    read()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak, points
+
+
+def bench_stream(rows, max_points, resolution):
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for layout in LAYOUTS:
+            file_path = os.path.join(directory, f"{layout}.csv")
+            _write_profile(file_path, rows, layout)
+            size = os.path.getsize(file_path)
+            readers = (
+                ("read_profile", read_profile, {}),
+                ("stream", stream_profile_file, {}),
+                ("stream_max_points", stream_profile_file, {"max_points": max_points}),
+                ("stream_resolution", stream_profile_file, {"resolution": resolution}),
+            )
+            for name, reader, options in readers:
+                read = partial(reader, file_path, **options)
+                seconds, peak, points = _measure(read)
+                error = None
+                if options:
+                    error = normalize_profile(_points(read()))[1].first_error()
+                results.append({
+                    "layout": layout,
+                    "reader": name,
+                    "seconds": seconds,
+                    "rows_per_second": rows / seconds if seconds > 0 else 0.0,
+                    "peak_bytes": peak,
+                    "points": points,
+                    "error": error,
+                })
+    return size, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure reading of one large profile file.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--max-points", type=int, default=DEFAULT_MAX_POINTS)
+    parser.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION)
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args(argv)
+
+    size, results = bench_stream(args.rows, args.max_points, args.resolution)
+    print(f"{args.rows} rows, {size / 2 ** 20:.1f} MB", file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['layout']:<11} {result['reader']:<20} {result['seconds']:>7.2f} s "
+            f"{result['rows_per_second']:>12,.0f} rows/s "
+            f"{result['peak_bytes'] / 2 ** 20:>8.1f} MB peak {result['points']:>9} points "
+            f"{result['error'] or 'valid'}"
+        )
+
+    if args.output:
+        report = {
+            "meta": {
+                "revision": _git_revision(),
+                "python": platform.python_version(),
+                "numpy": HAS_NUMPY,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "rows": args.rows,
+                "bytes": size,
+                "max_points": args.max_points,
+                "resolution": args.resolution,
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
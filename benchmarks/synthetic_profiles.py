@@ -0,0 +1,102 @@
+# Synthetic NACA 4-digit profiles for the benchmarks.
+# Every generator returns a list of (x, y) tuples with unit chord.
+
+import math
+import random
+
+
+def _naca4_point(code, x_val):
+    m = int(code[0]) / 100.0
+    p = int(code[1]) / 10.0
+    t = int(code[2:]) / 100.0
+    yt = 5.0 * t * (
+        0.2969 * math.sqrt(x_val)
+        - 0.1260 * x_val
+        - 0.3516 * x_val ** 2
+        + 0.2843 * x_val ** 3
+        - 0.1036 * x_val ** 4
+    )
+    if m > 0 and p > 0:
+        if x_val < p:
+            yc = m / p ** 2 * (2 * p * x_val - x_val ** 2)
+        else:
+            yc = m / (1 - p) ** 2 * ((1 - 2 * p) + 2 * p * x_val - x_val ** 2)
+    else:
+        yc = 0.0
+    return yc, yt
+
+
+def naca4_surfaces(code="2412", stations=100):
+    upper = []
+    lower = []
+    for idx in range(stations):
+        x_val = 0.5 * (1.0 - math.cos(math.pi * idx / (stations - 1)))
+        yc, yt = _naca4_point(code, x_val)
+        upper.append((x_val, yc + yt))
+        lower.append((x_val, yc - yt))
+
+    upper[0] = lower[0] = (0.0, 0.0)
+    upper[-1] = lower[-1] = (1.0, 0.0)
+    return upper, lower
+
+
+def _stations_for(points):
+    return max(3, points // 2 + 1)
+
+
+def ordered_profile(points, code="2412"):
+    upper, lower = naca4_surfaces(code, _stations_for(points))
+    return list(reversed(upper)) + lower[1:]
+
+
+def interleaved_profile(points, code="2412"):
+    upper, lower = naca4_surfaces(code, _stations_for(points))
+    result = [lower[0]]
+    for low, up in zip(lower[1:], upper[1:]):
+        result.append(low)
+        result.append(up)
+    return result
+
+
+def duplicated_profile(points, code="2412", repeats=3):
+    return ordered_profile(points, code) + [(1.0, 0.0)] * repeats
+
+
+def noisy_trailing_edge_profile(points, code="2412", seed=1):
+    rng = random.Random(seed)
+    upper, lower = naca4_surfaces(code, _stations_for(points))
+    noisy_lower = []
+    for idx, (x_val, y_val) in enumerate(lower):
+        if 0.98 <= x_val < 1.0:
+            y_val *= 1.0 + (1 if idx % 2 else -1) * rng.uniform(0.2, 0.4)
+        noisy_lower.append((x_val, y_val))
+    return list(reversed(upper)) + noisy_lower[1:]
+
+
+# Like a 3D scan export: each surface at its own randomly moved stations,
+# y noise of `noise` times the local station spacing, rows in random order.
+def scanned_profile(points, code="2412", seed=1, noise=0.1):
+    rng = random.Random(seed)
+    stations = _stations_for(points)
+    cloud = [(0.0, 0.0), (1.0, 0.0)]
+    for sign in (1.0, -1.0):
+        for idx in range(1, stations - 1):
+            position = (idx + rng.uniform(-0.3, 0.3)) / (stations - 1)
+            x_val = 0.5 * (1.0 - math.cos(math.pi * position))
+            spacing = 0.5 * math.pi * math.sin(math.pi * position) / (stations - 1)
+            yc, yt = _naca4_point(code, x_val)
+            cloud.append((x_val, yc + sign * yt + rng.gauss(0.0, noise * spacing)))
+    rng.shuffle(cloud)
+    return cloud
+
+
+VARIANTS = {
+    "ordered": ordered_profile,
+    "interleaved": interleaved_profile,
+    "duplicated": duplicated_profile,
+    "noisy_te": noisy_trailing_edge_profile,
+}
+
+
+def profile_csv_text(points):
+    return "".join(f"{x_val:.8f},{y_val:.8f},0.0\n" for x_val, y_val in points)
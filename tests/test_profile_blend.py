@@ -0,0 +1,42 @@
+import math
+
+import pytest
+
+from FlightProfiles.profileCore import ProfileArray, ProfileBlender
+
+
+# Cambered NACA 4412 contour, trailing edge upper first.
+def _cambered_profile(stations=60, chord=1.0):
+    upper = []
+    lower = []
+    for idx in range(stations + 1):
+        x_val = 0.5 * (1.0 - math.cos(math.pi * idx / stations))
+        thickness = 0.6 * (
+            0.2969 * math.sqrt(x_val) - 0.126 * x_val - 0.3516 * x_val ** 2
+            + 0.2843 * x_val ** 3 - 0.1036 * x_val ** 4
+        )
+        if x_val < 0.4:
+            camber = 0.04 / 0.16 * (0.8 * x_val - x_val ** 2)
+        else:
+            camber = 0.04 / 0.36 * (0.2 + 0.8 * x_val - x_val ** 2)
+        upper.append((x_val * chord, (camber + thickness) * chord))
+        lower.append((x_val * chord, (camber - thickness) * chord))
+    return ProfileArray.from_points(upper[::-1] + lower[1:])
+
+
+def test_blend_rejects_opposite_mirror_flags():
+    profile = _cambered_profile()
+    with pytest.raises(ValueError, match="mirrored"):
+        ProfileBlender([profile, profile], mirrors=[False, True])
+
+
+def test_blend_mirrors_sections_of_mirrored_stations():
+    root = _cambered_profile()
+    tip = _cambered_profile(chord=0.5)
+    plain = ProfileBlender([root, tip])
+    mirrored = ProfileBlender([root, tip], mirrors=[True, True])
+
+    assert list(mirrored.section(0.5)) == list(plain.section(0.5).mirrored())
+    start = mirrored.section(0.0)
+    assert max(start.ys) == pytest.approx(-min(root.ys), abs=1e-3)
+    assert min(start.ys) == pytest.approx(-max(root.ys), abs=1e-3)
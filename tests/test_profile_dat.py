@@ -0,0 +1,21 @@
+from FlightProfiles.profileCore import parse_profile_text, parse_selig_text
+
+
+def test_selig_three_columns_keep_x_and_y_per_line():
+    text = "NACA 0012 with z\n1.0 0.001 5.0\n0.5 0.06 5.0\n0.0 0.0 5.0\n0.5 -0.06 5.0\n"
+    points = parse_selig_text(text)
+
+    assert list(points.xs) == [1.0, 0.5, 0.0, 0.5]
+    assert list(points.ys) == [0.001, 0.06, 0.0, -0.06]
+
+
+def test_lednicer_with_wrong_counts_drops_the_count_line():
+    text = (
+        "LEDNICER SAMPLE\n3. 3.\n\n"
+        "0.0 0.0\n0.25 0.05\n0.5 0.06\n1.0 0.0\n\n"
+        "0.0 0.0\n0.25 -0.04\n0.5 -0.05\n1.0 0.0\n"
+    )
+    points, _ = parse_profile_text(text, "sample.dat")
+
+    assert (3.0, 3.0) not in list(points)
+    assert len(points) == 8